@@ -0,0 +1,163 @@
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ADAPTIVE_LIMIT = os.environ.get("ADAPTIVE_LIMIT", "1") == "1"
+BROWSER_LIMIT_MIN = int(os.environ.get("BROWSER_LIMIT_MIN", "1"))
+BROWSER_LIMIT_MAX = int(os.environ.get("BROWSER_LIMIT_MAX", "6"))
+# A scrape slower than this (p90 over a window) means upstream or the box is saturated
+SCRAPE_TARGET_LATENCY_MS = float(os.environ.get("SCRAPE_TARGET_LATENCY_MS", "20000"))
+SCRAPE_MAX_ERROR_RATE = float(os.environ.get("SCRAPE_MAX_ERROR_RATE", "0.2"))
+# Memory to keep free for the API itself, and the rough cost of one more Chromium
+MIN_FREE_MEMORY_MB = float(os.environ.get("MIN_FREE_MEMORY_MB", "400"))
+BROWSER_MEMORY_MB = float(os.environ.get("BROWSER_MEMORY_MB", "300"))
+ADAPTIVE_WINDOW = int(os.environ.get("ADAPTIVE_WINDOW", "10"))
+
+
+def _read_int(path: str) -> Optional[int]:
+    try:
+        raw = Path(path).read_text().strip()
+    except OSError:
+        return None
+    return int(raw) if raw.isdigit() else None
+
+
+def available_memory_mb() -> Optional[float]:
+    """
+    Free memory for this process in MB, honouring container limits.
+
+    /proc/meminfo reports the host inside Docker, so the cgroup limit (v2, then v1)
+    is checked as well and the smaller figure wins. None when neither is readable.
+    """
+    candidates = []
+    try:
+        for line in Path("/proc/meminfo").read_text().splitlines():
+            if line.startswith("MemAvailable:"):
+                candidates.append(int(line.split()[1]) / 1024)
+                break
+    except OSError:
+        pass
+
+    for limit_path, usage_path in (("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+                                   ("/sys/fs/cgroup/memory/memory.limit_in_bytes",
+                                    "/sys/fs/cgroup/memory/memory.usage_in_bytes")):
+        limit, usage = _read_int(limit_path), _read_int(usage_path)
+        # cgroup v1 reports "no limit" as a huge number
+        if limit is not None and usage is not None and limit < 1 << 60:
+            candidates.append((limit - usage) / (1024 * 1024))
+            break
+
+    return min(candidates) if candidates else None
+
+
+class AdaptiveLimiter:
+    """
+    AIMD controller for the browser concurrency limit.
+
+    Every `window` scrapes it looks at p90 latency, error rate and free memory:
+    - any of them bad: multiply the limit by `decrease_factor` (at least -1)
+    - all good and requests had to queue for a slot: add 1
+    The limit always stays within [min_limit, max_limit].
+
+    Every worker runs its own controller against the shared limit, so a change is written
+    with compare-and-set: if another worker moved the limit after it was read, this
+    decision is dropped instead of being stacked on top of the other one.
+    """
+
+    def __init__(self, get_limit: Callable[[], int], compare_and_set_limit: Callable[[int, int], bool],
+                 min_limit: int = BROWSER_LIMIT_MIN, max_limit: int = BROWSER_LIMIT_MAX,
+                 target_latency_ms: float = SCRAPE_TARGET_LATENCY_MS, max_error_rate: float = SCRAPE_MAX_ERROR_RATE,
+                 min_free_memory_mb: float = MIN_FREE_MEMORY_MB, browser_memory_mb: float = BROWSER_MEMORY_MB,
+                 window: int = ADAPTIVE_WINDOW, decrease_factor: float = 0.7,
+                 memory_probe: Callable[[], Optional[float]] = available_memory_mb):
+        self.get_limit = get_limit
+        self.compare_and_set_limit = compare_and_set_limit
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.target_latency_ms = target_latency_ms
+        self.max_error_rate = max_error_rate
+        self.min_free_memory_mb = min_free_memory_mb
+        self.browser_memory_mb = browser_memory_mb
+        self.window = window
+        self.decrease_factor = decrease_factor
+        self.memory_probe = memory_probe
+
+        self._lock = threading.Lock()
+        self._samples: List[tuple] = []
+        self.changes = deque(maxlen=50)
+        self.last_evaluation: Dict = {}
+
+        # Bring a limit left over from a previous configuration back into bounds
+        current = get_limit()
+        if not self.min_limit <= current <= self.max_limit:
+            self._apply(current, min(max(current, self.min_limit), self.max_limit), "out of configured bounds", {})
+
+    def record(self, latency_s: float, ok: bool, queued: bool = False):
+        """Reports one finished scrape. `queued` means it had to wait for a free slot."""
+        with self._lock:
+            self._samples.append((latency_s * 1000, ok, queued))
+            if len(self._samples) < self.window:
+                return
+            samples, self._samples = self._samples, []
+        self._evaluate(samples)
+
+    def _evaluate(self, samples: List[tuple]):
+        latencies = sorted(s[0] for s in samples)
+        p90 = latencies[min(len(latencies) - 1, math.ceil(0.9 * len(latencies)) - 1)]
+        error_rate = sum(1 for s in samples if not s[1]) / len(samples)
+        queued = any(s[2] for s in samples)
+        free_mb = self.memory_probe()
+        stats = {"p90_ms": round(p90, 1), "error_rate": round(error_rate, 3), "queued": queued,
+                 "free_memory_mb": round(free_mb, 1) if free_mb is not None else None}
+
+        current = self.get_limit()
+        reasons = []
+        if error_rate > self.max_error_rate:
+            reasons.append(f"error rate {error_rate:.0%}")
+        if p90 > self.target_latency_ms:
+            reasons.append(f"p90 {p90:.0f}ms")
+        if free_mb is not None and free_mb < self.min_free_memory_mb:
+            reasons.append(f"free memory {free_mb:.0f}MB")
+
+        new = current
+        if reasons:
+            new = max(self.min_limit, min(current - 1, int(current * self.decrease_factor)))
+            reason = "decrease: " + ", ".join(reasons)
+        elif queued and (free_mb is None or free_mb >= self.min_free_memory_mb + self.browser_memory_mb):
+            new = min(self.max_limit, current + 1)
+            reason = "increase: healthy and saturated"
+        else:
+            reason = "hold"
+
+        self.last_evaluation = {"at": time.time(), "limit": current, "decision": reason, **stats}
+        if new != current:
+            self._apply(current, new, reason, stats)
+
+    def _apply(self, old: int, new: int, reason: str, stats: Dict):
+        if not self.compare_and_set_limit(old, new):
+            logger.info(f"Browser limit change {old} -> {new} skipped: changed by another worker")
+            return
+        change = {"at": time.time(), "from": old, "to": new, "reason": reason, **stats}
+        self.changes.append(change)
+        logger.info(f"Browser limit {old} -> {new} ({reason})")
+
+    def snapshot(self) -> Dict:
+        return {
+            "enabled": True,
+            "limit": self.get_limit(),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "target_latency_ms": self.target_latency_ms,
+            "max_error_rate": self.max_error_rate,
+            "min_free_memory_mb": self.min_free_memory_mb,
+            "free_memory_mb": self.memory_probe(),
+            "last_evaluation": self.last_evaluation,
+            "changes": list(self.changes),
+        }
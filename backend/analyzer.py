@@ -1,12 +1,17 @@
 import numpy as np
 import pandas as pd
 from sklearn.linear_model import LinearRegression
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from backend.data_processor import compact_subjects
+
+# Passing grades and their points, lowest first; used to name the grade a scenario needs
+PASSING_GRADES = [('C', 5), ('B', 6), ('B+', 7), ('A', 8), ('A+', 9), ('O', 10)]
 
 class AcademicAnalyzer:
     def __init__(self, semesters_df: pd.DataFrame, subjects_df: pd.DataFrame = None):
         self.df = semesters_df
-        self.subjects_df = subjects_df if subjects_df is not None else pd.DataFrame()
+        self.subjects_df = compact_subjects(subjects_df) if subjects_df is not None else pd.DataFrame()
         
     def analyze_performance(self) -> Dict:
         """
@@ -44,7 +49,9 @@ class AcademicAnalyzer:
         
         # 4. Dominant Grade (Mode)
         try:
-            stats['dominant_grade'] = self.subjects_df['grade'].mode()[0]
+            # Ties go to the lexically smallest grade, as with plain string columns
+            # (a categorical grade column would otherwise order them O, A+, A, ...)
+            stats['dominant_grade'] = sorted(str(g) for g in self.subjects_df['grade'].mode())[0]
         except:
             pass
             
@@ -113,6 +120,120 @@ class AcademicAnalyzer:
                         if achievable else "Target is mathematically impossible with standard credits")
         }
         
+    def target_cgpa_grid(self, current_cgpa: float, total_completed_credits: float,
+                         target_cgpas: Sequence[float], remaining_semesters: Sequence[int] = (1,),
+                         credits_per_sem: Sequence[float] = (21,), feasible_only: bool = False) -> Dict:
+        """
+        calculate_target_cgpa over every (target, remaining semesters, credits per sem)
+        combination at once with numpy broadcasting.
+
+        A negative requirement means the target is met whatever the future SGPA, so it is
+        reported as 0 and counted as feasible; only requirements above 10 are infeasible.
+        `cases` is a column table (one numpy array per field, see backend.encoding), so
+        large grids are never expanded into one dict per case.
+        """
+        targets = np.asarray(target_cgpas, dtype=float)[:, None, None]
+        semesters = np.asarray(remaining_semesters, dtype=float)[None, :, None]
+        credits = np.asarray(credits_per_sem, dtype=float)[None, None, :]
+
+        future_credits = semesters * credits
+        current_points = current_cgpa * total_completed_credits
+        required = (targets * (total_completed_credits + future_credits) - current_points) / future_credits
+        required, targets, semesters, credits = np.broadcast_arrays(required, targets, semesters, credits)
+
+        feasible = required <= 10
+        required = np.round(np.maximum(required, 0), 2)
+
+        # Easiest case per target (lowest SGPA needed) before any filtering
+        flat = required.reshape(len(target_cgpas), -1)
+        easiest = flat.argmin(axis=1)
+        by_target = [{
+            'target_cgpa': float(target_cgpas[i]),
+            'feasible_cases': int(feasible[i].sum()),
+            'min_required_sgpa': float(flat[i, easiest[i]]),
+            'remaining_semesters': int(semesters[i].ravel()[easiest[i]]),
+            'credits_per_sem': float(credits[i].ravel()[easiest[i]]),
+        } for i in range(len(target_cgpas))]
+
+        keep = feasible.ravel() if feasible_only else slice(None)
+        cases = {
+            'target_cgpa': targets.ravel()[keep],
+            'remaining_semesters': semesters.ravel()[keep].astype(int),
+            'credits_per_sem': credits.ravel()[keep],
+            'required_sgpa': required.ravel()[keep],
+            'feasible': feasible.ravel()[keep],
+        }
+        return {
+            'total_cases': int(required.size),
+            'feasible_count': int(feasible.sum()),
+            'cases': cases,
+            'by_target': by_target,
+        }
+
+    def grade_change_options(self, target_cgpas: Sequence[float], max_single: int = 10) -> List[Dict]:
+        """
+        Which grade changes in already completed subjects reach each target CGPA
+        (e.g. through revaluation or supplementary exams), using the subject rows
+        the CGPA was computed from:
+
+        - single_subject: subjects where improving just that one grade is enough,
+          with the lowest grade that does it (at most `max_single`, smallest jump first)
+        - min_subjects: fewest subjects that must be raised to O, taking the largest
+          credit x grade point gains first, and which subjects those are
+        """
+        df = self.subjects_df
+        if df.empty:
+            return []
+
+        credits = df['credits'].to_numpy(dtype=float)
+        points = df['grade_points'].to_numpy(dtype=float)
+        total_credits = credits.sum()
+        if total_credits <= 0:
+            return []
+        targets = np.asarray(target_cgpas, dtype=float)
+        needed = targets * total_credits - (credits * points).sum()
+
+        # (targets x subjects) grade points each subject alone would need
+        with np.errstate(divide='ignore', invalid='ignore'):
+            required_points = points[None, :] + needed[:, None] / credits[None, :]
+        levels = np.array([p for _, p in PASSING_GRADES], dtype=float)
+        level_idx = np.searchsorted(levels, required_points - 1e-9)
+        single_ok = (credits[None, :] > 0) & (level_idx < len(levels)) & (needed[:, None] > 0)
+
+        gains = credits * (10 - points)
+        order = np.argsort(-gains, kind='stable')
+        cumulative = np.cumsum(gains[order])
+        min_counts = np.searchsorted(cumulative, needed - 1e-9) + 1
+
+        codes = df['subject_code'].astype(str).to_numpy()
+        grades = df['grade'].astype(str).to_numpy()
+        semesters = [f"{int(y)}-{int(s)}" for y, s in zip(df['year'], df['sem'])]
+
+        options = []
+        for i, target in enumerate(targets):
+            if needed[i] <= 0:
+                options.append({'target_cgpa': float(target), 'already_met': True, 'single_subject': [],
+                                'min_subjects': 0, 'upgrade_to_O': []})
+                continue
+            candidates = np.flatnonzero(single_ok[i])
+            jumps = levels[np.minimum(level_idx[i, candidates], len(levels) - 1)] - points[candidates]
+            candidates = candidates[np.argsort(jumps, kind='stable')][:max_single]
+            feasible = min_counts[i] <= len(order) and cumulative[-1] >= needed[i] - 1e-9
+            options.append({
+                'target_cgpa': float(target),
+                'already_met': False,
+                'points_needed': round(float(needed[i]), 2),
+                'single_subject': [{
+                    'subject_code': codes[j],
+                    'semester': semesters[j],
+                    'current_grade': grades[j],
+                    'required_grade': PASSING_GRADES[level_idx[i, j]][0],
+                } for j in candidates],
+                'min_subjects': int(min_counts[i]) if feasible else None,
+                'upgrade_to_O': [codes[j] for j in order[:min_counts[i]]] if feasible else [],
+            })
+        return options
+
     def get_insights(self) -> List[Dict]:
         """
         Generate heuristic insights based on data
@@ -0,0 +1,290 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, closing
+from pathlib import Path
+from typing import Dict, Optional
+
+# Shared by every uvicorn worker on the host. "sqlite" needs nothing extra;
+# "redis" talks to any Redis-compatible server (Redis, Valkey, KeyDB, a local stand-in).
+COORD_BACKEND = os.environ.get("COORD_BACKEND", "sqlite")
+COORD_SQLITE_PATH = os.environ.get("COORD_SQLITE_PATH", str(Path(tempfile.gettempdir()) / "jntuh-coordination.sqlite3"))
+COORD_REDIS_URL = os.environ.get("COORD_REDIS_URL", "redis://127.0.0.1:6379/0")
+COORD_PREFIX = os.environ.get("COORD_PREFIX", "jntuh")
+
+# Host-wide number of Chromium instances, across all workers.
+# 3 concurrent browsers = ~9 requests/min = ~540 requests/hour, which covers 500+ req/day
+# without running the server out of RAM, however many workers uvicorn starts.
+BROWSER_LIMIT = int(os.environ.get("BROWSER_LIMIT", "3"))
+# A slot whose holder died is reclaimed after this long (must exceed the scrape deadline)
+SLOT_LEASE_SECONDS = float(os.environ.get("SLOT_LEASE_SECONDS", "120"))
+
+
+class Coordinator(ABC):
+    """
+    Host-wide browser slots and a shared key/value cache.
+
+    Subclasses implement the primitives as plain blocking calls (a SQLite lock or a
+    Redis round trip); async callers run them with asyncio.to_thread, and waiting for
+    a slot is done here with asyncio.sleep, so the event loop is never blocked.
+    """
+
+    def __init__(self, limit: int = BROWSER_LIMIT, lease_seconds: float = SLOT_LEASE_SECONDS):
+        # The live limit is kept in the shared store so every worker enforces the same value;
+        # this is only the initial value when the store has none yet
+        self.default_limit = limit
+        self.lease_seconds = lease_seconds
+
+    # Backend primitives
+    @abstractmethod
+    def try_acquire(self, token: str) -> bool:
+        ...
+
+    @abstractmethod
+    def release(self, token: str):
+        ...
+
+    @abstractmethod
+    def in_use(self) -> int:
+        ...
+
+    @abstractmethod
+    def cache_get(self, key: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def cache_set(self, key: str, value: Dict, ttl: float):
+        ...
+
+    @abstractmethod
+    def get_limit(self) -> int:
+        ...
+
+    @abstractmethod
+    def set_limit(self, limit: int):
+        ...
+
+    @abstractmethod
+    def compare_and_set_limit(self, expected: int, limit: int) -> bool:
+        """Sets the limit only if it is still `expected`; False when another worker changed it first."""
+        ...
+
+    @asynccontextmanager
+    async def browser_slot(self, timeout: float, poll_interval: float = 0.05):
+        """
+        Holds one host-wide browser slot for the duration of the block.
+
+        Yields True when the caller had to queue for the slot (used as a demand signal).
+        Raises asyncio.TimeoutError when no slot frees up within `timeout` seconds.
+        """
+        token = f"{os.getpid()}:{uuid.uuid4().hex}"
+        give_up_at = time.monotonic() + timeout
+        delay = poll_interval
+        queued = False
+        try:
+            while not await asyncio.to_thread(self.try_acquire, token):
+                queued = True
+                if time.monotonic() >= give_up_at:
+                    raise asyncio.TimeoutError("No browser slot available")
+                await asyncio.sleep(min(delay, max(0.0, give_up_at - time.monotonic())))
+                delay = min(delay * 2, 0.5)
+            yield queued
+        finally:
+            # Also runs when cancelled mid-acquire, since the thread may have taken the slot anyway
+            await asyncio.to_thread(self.release, token)
+
+    def snapshot(self) -> Dict:
+        return {"backend": type(self).__name__, "limit": self.get_limit(), "in_use": self.in_use(),
+                "lease_seconds": self.lease_seconds}
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SqliteCoordinator(Coordinator):
+    """Coordination through a SQLite file; works for any number of workers on one host."""
+
+    def __init__(self, path: str = COORD_SQLITE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS slots (token TEXT PRIMARY KEY, pid INTEGER, expires_at REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+            self._init_limit(conn)
+
+    def _init_limit(self, conn: sqlite3.Connection):
+        """
+        The first process of a new run resets the stored limit to the configured one, so a
+        changed BROWSER_LIMIT takes effect after a restart; workers joining a running server
+        keep the live (possibly adapted) value. The run is identified by the pid that last
+        reset the limit still being alive.
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM settings WHERE key = 'limit_owner_pid'").fetchone()
+            if row is None or not _pid_alive(int(row[0])):
+                conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('browser_limit', ?)",
+                             (str(self.default_limit),))
+                conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('limit_owner_pid', ?)",
+                             (str(os.getpid()),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode so BEGIN IMMEDIATE below controls the write lock explicitly
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def _reap(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM slots WHERE expires_at < ?", (now,))
+        for token, pid in conn.execute("SELECT token, pid FROM slots").fetchall():
+            if not _pid_alive(pid):
+                conn.execute("DELETE FROM slots WHERE token = ?", (token,))
+
+    def try_acquire(self, token: str) -> bool:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._reap(conn, now)
+            (count,) = conn.execute("SELECT COUNT(*) FROM slots").fetchone()
+            acquired = count < self._read_limit(conn)
+            if acquired:
+                conn.execute("INSERT INTO slots (token, pid, expires_at) VALUES (?, ?, ?)",
+                             (token, os.getpid(), now + self.lease_seconds))
+            conn.execute("COMMIT")
+            return acquired
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def release(self, token: str):
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM slots WHERE token = ?", (token,))
+
+    def _read_limit(self, conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM settings WHERE key = 'browser_limit'").fetchone()
+        return int(row[0]) if row else self.default_limit
+
+    def get_limit(self) -> int:
+        with closing(self._connect()) as conn:
+            return self._read_limit(conn)
+
+    def set_limit(self, limit: int):
+        with closing(self._connect()) as conn:
+            conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('browser_limit', ?)",
+                         (str(max(1, int(limit))),))
+
+    def compare_and_set_limit(self, expected: int, limit: int) -> bool:
+        with closing(self._connect()) as conn:
+            cursor = conn.execute("UPDATE settings SET value = ? WHERE key = 'browser_limit' AND value = ?",
+                                  (str(max(1, int(limit))), str(int(expected))))
+            return cursor.rowcount == 1
+
+    def in_use(self) -> int:
+        with closing(self._connect()) as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM slots WHERE expires_at >= ?", (time.time(),)).fetchone()
+        return count
+
+    def cache_get(self, key: str) -> Optional[Dict]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value FROM cache WHERE key = ? AND expires_at >= ?",
+                               (key, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def cache_set(self, key: str, value: Dict, ttl: float):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                         (key, json.dumps(value), now + ttl))
+            conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+
+
+class RedisCoordinator(Coordinator):
+    """Coordination through a Redis-compatible server (needs the `redis` package)."""
+
+    # Drop expired holders, then take a slot if one is free; atomic on the server
+    ACQUIRE_SCRIPT = """
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+    local limit = tonumber(redis.call('GET', KEYS[2]) or ARGV[2])
+    if redis.call('ZCARD', KEYS[1]) < limit then
+        redis.call('ZADD', KEYS[1], ARGV[3], ARGV[4])
+        return 1
+    end
+    return 0
+    """
+
+    # Replace the limit only if it still holds the value the caller based its decision on
+    LIMIT_CAS_SCRIPT = """
+    local current = tonumber(redis.call('GET', KEYS[1]) or ARGV[3])
+    if current == tonumber(ARGV[1]) then
+        redis.call('SET', KEYS[1], ARGV[2])
+        return 1
+    end
+    return 0
+    """
+
+    def __init__(self, url: str = COORD_REDIS_URL, prefix: str = COORD_PREFIX, **kwargs):
+        import redis
+
+        super().__init__(**kwargs)
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.slots_key = f"{prefix}:browser_slots"
+        self.limit_key = f"{prefix}:browser_limit"
+        self.client.set(self.limit_key, self.default_limit, nx=True)
+        self._acquire = self.client.register_script(self.ACQUIRE_SCRIPT)
+        self._limit_cas = self.client.register_script(self.LIMIT_CAS_SCRIPT)
+
+    def try_acquire(self, token: str) -> bool:
+        now = time.time()
+        return bool(self._acquire(keys=[self.slots_key, self.limit_key],
+                                  args=[now, self.default_limit, now + self.lease_seconds, token]))
+
+    def release(self, token: str):
+        self.client.zrem(self.slots_key, token)
+
+    def in_use(self) -> int:
+        return self.client.zcount(self.slots_key, time.time(), "+inf")
+
+    def get_limit(self) -> int:
+        raw = self.client.get(self.limit_key)
+        return int(raw) if raw else self.default_limit
+
+    def set_limit(self, limit: int):
+        self.client.set(self.limit_key, max(1, int(limit)))
+
+    def compare_and_set_limit(self, expected: int, limit: int) -> bool:
+        return bool(self._limit_cas(keys=[self.limit_key], args=[int(expected), max(1, int(limit)), self.default_limit]))
+
+    def cache_get(self, key: str) -> Optional[Dict]:
+        raw = self.client.get(f"{self.prefix}:cache:{key}")
+        return json.loads(raw) if raw else None
+
+    def cache_set(self, key: str, value: Dict, ttl: float):
+        self.client.set(f"{self.prefix}:cache:{key}", json.dumps(value), px=int(ttl * 1000))
+
+
+def get_coordinator() -> Coordinator:
+    if COORD_BACKEND == "redis":
+        return RedisCoordinator()
+    if COORD_BACKEND == "sqlite":
+        return SqliteCoordinator()
+    raise ValueError(f"Unknown COORD_BACKEND '{COORD_BACKEND}', expected 'sqlite' or 'redis'")
@@ -1,10 +1,11 @@
 import re
 import pandas as pd
 import numpy as np
-import pdfplumber
 import logging
 from typing import Dict, List, Optional, Tuple
 
+from backend.pdf_text import DEFAULT_REGION, Region, iter_extractions, read_pdf_bytes
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -16,35 +17,140 @@ GRADE_POINTS = {
 
 STANDARD_CREDITS_PER_SEM = 21  # R18 standard, configurable
 
+# Any line ending in a grade and credits; used to check that a text backend's subject lines all parsed
+GRADED_LINE_PATTERN = r"\s(O|A\+|A|B\+|B|C|F|Ab|ABSENT)\s+(\d+(?:\.\d)?)\s*$"
+
+# Compact subject row layout (see compact_subjects): a subject row costs a few dozen bytes
+# instead of several hundred, which matters when batches of students share one process
+GRADE_CATEGORIES = ['O', 'A+', 'A', 'B+', 'B', 'C', 'F', 'Ab']
+SMALL_INT_COLUMNS = ('year', 'sem', 'grade_points')
+FLOAT32_COLUMNS = ('credits', 'credit_points')
+# Categories are per frame: strings from client data are never kept past the frame that holds them
+CATEGORY_COLUMNS = ('subject_code', 'subject_name', 'htno')
+
+
+def _fits_int8(values: pd.Series) -> bool:
+    return bool(values.notna().all() and (values % 1 == 0).all() and values.between(-128, 127).all())
+
+
+def compact_subjects(df: pd.DataFrame, categorical: bool = True) -> pd.DataFrame:
+    """
+    Returns subjects_df with the compact dtypes: categorical grade / subject code / name / htno,
+    int8 year, sem and grade points, float32 credits. Columns that cannot be converted
+    without loss (unexpected values from API clients) keep their dtype. Idempotent.
+
+    categorical=False only narrows the numeric columns and leaves strings as they are.
+    """
+    if df.empty:
+        return df
+    df = df.copy(deep=False)
+
+    if categorical and 'grade' in df and not isinstance(df['grade'].dtype, pd.CategoricalDtype):
+        extra = sorted({g for g in df['grade'].dropna().unique() if g not in GRADE_CATEGORIES}, key=str)
+        df['grade'] = pd.Categorical(df['grade'], categories=GRADE_CATEGORIES + extra)
+
+    for col in CATEGORY_COLUMNS if categorical else ():
+        if col in df and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = pd.Categorical(df[col])
+
+    for col in SMALL_INT_COLUMNS:
+        if col in df and df[col].dtype != np.int8:
+            values = pd.to_numeric(df[col], errors='coerce')
+            if _fits_int8(values):
+                df[col] = values.astype(np.int8)
+
+    for col in FLOAT32_COLUMNS:
+        if col in df and df[col].dtype != np.float32 and pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype(np.float32)
+
+    return df
+
+
+def add_credit_points(df: pd.DataFrame):
+    df['credit_points'] = (df['credits'] * df['grade_points']).astype(np.float32)
+
+
+def aggregate_gpa(subjects_df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """
+    Σ(C * GP) / ΣC per group, rounded to 2 places: SGPA for ['year', 'sem'],
+    CGPA for ['htno'], per-student SGPA for ['htno', 'year', 'sem'].
+    Expects the credit_points column from add_credit_points().
+    """
+    agg = subjects_df.groupby(keys, observed=True).agg({
+        'credit_points': 'sum',
+        'credits': 'sum'
+    }).reset_index()
+    
+    # Divide in float64 so rounding matches the uncompacted layout exactly
+    agg['sgpa'] = agg['credit_points'].astype(np.float64) / agg['credits'].astype(np.float64)
+    agg['sgpa'] = agg['sgpa'].round(2)
+    
+    return agg.sort_values(keys)
+
+
+def memory_per_row(df: pd.DataFrame) -> float:
+    """Bytes per row including string contents (pandas deep memory usage)."""
+    if df.empty:
+        return 0.0
+    return df.memory_usage(deep=True).sum() / len(df)
+
+
 class AcademicProcessor:
     def __init__(self):
         self.semesters_df = pd.DataFrame()
         self.subjects_df = pd.DataFrame()
         self.student_info = {'name': '', 'htno': ''}
+        # Text backend that produced the last parsed PDF
+        self.text_backend = None
+
+    @classmethod
+    def from_subjects(cls, subjects: List[Dict], student_info: Optional[Dict[str, str]] = None) -> 'AcademicProcessor':
+        """
+        Builds a processor from already-extracted subject rows (e.g. a /fetch/htno result),
+        so SGPA/CGPA use the same formula as parsed PDFs.
+        """
+        processor = cls()
+        if student_info:
+            processor.student_info = {**processor.student_info, **student_info}
+        if subjects:
+            processor.subjects_df = compact_subjects(pd.DataFrame(subjects))
+            processor._update_semester_aggregates()
+        return processor
         
-    def parse_pdf(self, pdf_file) -> bool:
+    def parse_pdf(self, pdf_file, backends: Optional[List[str]] = None,
+                  region: Optional[Region] = DEFAULT_REGION) -> bool:
         """
         Parses a JNTUH result PDF and extracts student info and subject details.
         
         Args:
             pdf_file: File-like object (uploaded file or path)
+            backends: Text extraction backends to try in order (default PDF_TEXT_BACKENDS)
+            region: Page region (fractions x0, top, x1, bottom) to extract text from
             
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            with pdfplumber.open(pdf_file) as pdf:
-                full_text = ""
-                for page in pdf.pages:
-                    full_text += page.extract_text() + "\n"
+            data = read_pdf_bytes(pdf_file)
+            
+            # The fast backend comes first; fall back while its text leaves graded lines unparsed
+            # (a garbled layout can still yield a few subjects). With no complete output, the
+            # one with the most subjects wins.
+            full_text, subjects, used = "", [], None
+            for backend, text in iter_extractions(data, backends, region):
+                found, graded_lines = self._scan_subjects(text)
+                complete = bool(found) and len(found) == graded_lines
+                if complete or used is None or len(found) > len(subjects):
+                    full_text, subjects, used = text, found, backend
+                if complete:
+                    break
+                logger.info(f"{backend} output matched {len(found)} of {graded_lines} graded lines, trying next backend")
+            self.text_backend = used
                     
             # Extract basic info
             self.student_info = self._extract_student_info(full_text)
             logger.info(f"Parsed student info: {self.student_info}")
             
-            # Extract subjects
-            subjects = self._extract_subjects(full_text)
-            
             if not subjects:
                 logger.warning("No subjects found in PDF")
                 return False
@@ -56,7 +162,9 @@ class AcademicProcessor:
             if self.student_info['htno']:
                 new_subjects_df['htno'] = self.student_info['htno']
                 
-            self.subjects_df = pd.concat([self.subjects_df, new_subjects_df], ignore_index=True)
+            # Concatenating categoricals with different categories falls back to object columns,
+            # so the combined frame is compacted again
+            self.subjects_df = compact_subjects(pd.concat([self.subjects_df, new_subjects_df], ignore_index=True))
             self._update_semester_aggregates()
             
             return True
@@ -79,7 +187,15 @@ class AcademicProcessor:
         return info
 
     def _extract_subjects(self, text: str) -> List[Dict]:
+        return self._scan_subjects(text)[0]
+
+    def _scan_subjects(self, text: str) -> Tuple[List[Dict], int]:
+        """
+        Returns (subjects, graded_lines): graded_lines counts every line under a semester
+        header that ends in a grade and credits, so a shortfall means lines were missed.
+        """
         subjects = []
+        graded_lines = 0
         current_year = 0
         current_sem = 0
         
@@ -112,6 +228,9 @@ class AcademicProcessor:
             
             lines = section.split('\n')
             for line in lines:
+                if re.search(GRADED_LINE_PATTERN, line, re.IGNORECASE):
+                    graded_lines += 1
+
                 # Regex for Subject Line: Code (Alphanumeric) + Name (Text) + Grade (O/A+/F/Ab) + Credits (Number)
                 # Match end of line first: (O|A\+|A|B\+|B|C|F|Ab)\s+(\d+(?:\.\d)?)\s*$
                 
@@ -132,7 +251,7 @@ class AcademicProcessor:
                         'grade_points': GRADE_POINTS.get(grade, 0)
                     })
                     
-        return subjects
+        return subjects, graded_lines
 
     def _parse_semester_header(self, text: str) -> Optional[Tuple[int, int]]:
         # Try Roman "I Year I Semester"
@@ -164,25 +283,15 @@ class AcademicProcessor:
 
         # Calculate SGPA per semester
         # SGPA = Σ(C * GP) / ΣC
-        
-        self.subjects_df['credit_points'] = self.subjects_df['credits'] * self.subjects_df['grade_points']
-        
-        sem_agg = self.subjects_df.groupby(['year', 'sem']).agg({
-            'credit_points': 'sum',
-            'credits': 'sum'
-        }).reset_index()
-        
-        sem_agg['sgpa'] = sem_agg['credit_points'] / sem_agg['credits']
-        sem_agg['sgpa'] = sem_agg['sgpa'].round(2)
-        
-        self.semesters_df = sem_agg.sort_values(['year', 'sem'])
+        add_credit_points(self.subjects_df)
+        self.semesters_df = aggregate_gpa(self.subjects_df, ['year', 'sem'])
         
     def get_cgpa(self) -> float:
         if self.subjects_df.empty:
             return 0.0
             
-        total_points = self.subjects_df['credit_points'].sum()
-        total_credits = self.subjects_df['credits'].sum()
+        total_points = float(self.subjects_df['credit_points'].sum())
+        total_credits = float(self.subjects_df['credits'].sum())
         
         if total_credits == 0:
             return 0.0
@@ -0,0 +1,140 @@
+import gzip
+import json
+import os
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Optional fast paths: orjson for serialization, brotli for compression.
+# Both fall back to the standard library when the package is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.jntuh.columnar+json"
+
+# Payloads smaller than this are sent uncompressed; compressing them costs more than it saves
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "5"))
+
+# Keys holding lists of row dicts in the result / analysis payloads
+TABLE_KEYS = ("subjects", "semesters")
+
+
+# A table is a list of row dicts, or a mapping of equal-length columns (lists or numpy arrays)
+# for payloads that are computed column-wise and should not be expanded into rows first
+Table = Union[List[Dict], Mapping[str, Sequence]]
+
+
+def is_column_table(value) -> bool:
+    return isinstance(value, Mapping) and bool(value) and all(
+        isinstance(col, list) or hasattr(col, "tolist") for col in value.values())
+
+
+def _as_list(column) -> list:
+    return column.tolist() if hasattr(column, "tolist") else list(column)
+
+
+def to_rows(table: Table) -> List[Dict]:
+    """Row dicts for either table form."""
+    if not is_column_table(table):
+        return table
+    names = list(table)
+    return [dict(zip(names, row)) for row in zip(*(_as_list(col) for col in table.values()))]
+
+
+def to_columnar(records: Table) -> Dict:
+    """
+    Converts a table into one array per field.
+
+    Rows may have different keys (marks and official SGPA are optional), so the
+    column set is the union of all keys and missing values become None. A column
+    table is passed through without building any rows.
+    """
+    if is_column_table(records):
+        data = {name: _as_list(col) for name, col in records.items()}
+        return {"columns": list(data), "length": len(next(iter(data.values()))), "data": data}
+    columns: List[str] = []
+    seen = set()
+    for row in records:
+        for key in row:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+    return {
+        "columns": columns,
+        "length": len(records),
+        "data": {col: [row.get(col) for row in records] for col in columns},
+    }
+
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        # Non-str dict keys can appear in DataFrame-derived payloads
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def wants_columnar(request: Request) -> bool:
+    return (COLUMNAR_MEDIA_TYPE in request.headers.get("accept", "")
+            or request.query_params.get("format") == "columnar")
+
+
+def accepted_encodings(request: Request) -> Iterable[str]:
+    for part in request.headers.get("accept-encoding", "").split(","):
+        token, _, params = part.strip().partition(";")
+        if token and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            yield token.lower()
+
+
+def compress(body: bytes, request: Request, min_bytes: int = COMPRESS_MIN_BYTES):
+    """Returns (body, content-encoding or None), preferring brotli over gzip."""
+    if len(body) < min_bytes:
+        return body, None
+    encodings = set(accepted_encodings(request))
+    if brotli is not None and "br" in encodings:
+        return brotli.compress(body, quality=BROTLI_QUALITY), "br"
+    if "gzip" in encodings:
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), "gzip"
+    return body, None
+
+
+def encode_response(request: Request, payload: Dict, status_code: int = 200,
+                    table_keys: Iterable[str] = TABLE_KEYS, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Serializes a result / analysis payload according to the request's Accept headers.
+
+    - Accept: application/vnd.jntuh.columnar+json (or ?format=columnar) turns every
+      table under `table_keys` into the columnar shape from to_columnar(); otherwise
+      column tables are expanded into row lists
+    - Accept-Encoding: br / gzip compresses bodies above COMPRESS_MIN_BYTES
+    """
+    media_type = "application/json"
+    if wants_columnar(request):
+        payload = {key: to_columnar(value) if key in table_keys and (isinstance(value, list) or is_column_table(value))
+                   else value for key, value in payload.items()}
+        media_type = COLUMNAR_MEDIA_TYPE
+    else:
+        payload = {key: to_rows(value) if key in table_keys else value for key, value in payload.items()}
+
+    body, content_encoding = compress(dumps(payload), request)
+    headers = {"Vary": "Accept, Accept-Encoding", **(headers or {})}
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
+
+
+def from_columnar(table: Optional[Dict]) -> List[Dict]:
+    """Inverse of to_columnar(); fields a row did not have come back as None."""
+    if not table:
+        return []
+    data = table["data"]
+    return [{col: data[col][i] for col in table["columns"]} for i in range(table["length"])]
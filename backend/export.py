@@ -0,0 +1,190 @@
+import io
+import os
+from typing import Dict, Iterable, Iterator, List
+
+import pandas as pd
+
+from backend.data_processor import GRADE_POINTS, add_credit_points, aggregate_gpa, compact_subjects
+
+EXPORT_FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+# Students per CSV chunk / Parquet row group; memory stays bounded by this, not by the cohort size
+EXPORT_BATCH_STUDENTS = int(os.environ.get("EXPORT_BATCH_STUDENTS", "200"))
+
+# One row per subject attempt, with its semester's SGPA and the student's CGPA
+TRANSCRIPT_COLUMNS = ["htno", "name", "year", "sem", "subject_code", "subject_name", "grade", "credits",
+                      "grade_points", "sgpa", "cgpa"]
+# One row per student and semester
+SGPA_COLUMNS = ["htno", "name", "year", "sem", "credits", "sgpa", "cgpa"]
+
+EXPORT_TABLES = {"transcripts": TRANSCRIPT_COLUMNS, "sgpa": SGPA_COLUMNS}
+
+
+def _number(value, cast, field: str, where: str):
+    if value is None or value == "":
+        raise ValueError(f"{where}: missing {field}")
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: {field} must be a number, got {value!r}")
+
+
+def normalize_students(students: Iterable[Dict]) -> List[Dict]:
+    """
+    Validates inline export students before anything is streamed: every subject needs
+    year, sem and credits, and grade_points is derived from the grade when it is missing.
+
+    Raises:
+        ValueError: with the position of the first bad student or subject row
+    """
+    normalized = []
+    for i, student in enumerate(students):
+        if not isinstance(student, dict):
+            raise ValueError(f"students[{i}] must be an object")
+        subjects = student.get("subjects") or []
+        if not isinstance(subjects, list):
+            raise ValueError(f"students[{i}].subjects must be a list")
+        rows = []
+        for j, subject in enumerate(subjects):
+            where = f"students[{i}].subjects[{j}]"
+            if not isinstance(subject, dict):
+                raise ValueError(f"{where} must be an object")
+            row = dict(subject)
+            row["year"] = _number(subject.get("year"), int, "year", where)
+            row["sem"] = _number(subject.get("sem"), int, "sem", where)
+            row["credits"] = _number(subject.get("credits"), float, "credits", where)
+            if subject.get("grade_points") is None:
+                grade = str(subject.get("grade") or "").strip()
+                points = GRADE_POINTS.get(grade, GRADE_POINTS.get(grade.upper()))
+                if points is None:
+                    raise ValueError(f"{where}: grade_points missing and grade {grade!r} is not a known grade")
+                row["grade_points"] = points
+            else:
+                row["grade_points"] = _number(subject.get("grade_points"), int, "grade_points", where)
+            rows.append(row)
+        normalized.append({**student, "subjects": rows})
+    return normalized
+
+
+def batch_frame(students: List[Dict], table: str) -> pd.DataFrame:
+    """
+    Export rows for a batch of students ({htno, name, subjects}). SGPA and CGPA use
+    AcademicProcessor's formula (aggregate_gpa), grouped per student, so they match
+    /analyze/pdf and the results store.
+    """
+    columns = EXPORT_TABLES[table]
+    rows = []
+    for student in students:
+        htno = (student.get("htno") or "").upper()
+        name = student.get("name") or student.get("student_name") or ""
+        for subject in student.get("subjects") or []:
+            rows.append({**subject, "htno": htno, "name": name})
+    if not rows:
+        return pd.DataFrame(columns=columns)
+
+    # Numeric columns only: strings stay plain, so nothing outlives the batch and every
+    # batch has the same column types (Parquet row groups share one schema)
+    subjects_df = compact_subjects(pd.DataFrame(rows), categorical=False)
+    for col in ("subject_name", "grade"):
+        if col not in subjects_df:
+            subjects_df[col] = None
+    add_credit_points(subjects_df)
+
+    semesters = aggregate_gpa(subjects_df, ["htno", "year", "sem"])
+    cgpa = aggregate_gpa(subjects_df, ["htno"]).rename(columns={"sgpa": "cgpa"})[["htno", "cgpa"]]
+    # AcademicProcessor.get_cgpa reports 0.0 when no credits were earned
+    cgpa["cgpa"] = cgpa["cgpa"].fillna(0.0)
+
+    if table == "sgpa":
+        names = subjects_df[["htno", "name"]].drop_duplicates("htno")
+        frame = semesters.merge(cgpa, on="htno").merge(names, on="htno")
+    else:
+        frame = (subjects_df.merge(semesters[["htno", "year", "sem", "sgpa"]], on=["htno", "year", "sem"], how="left")
+                 .merge(cgpa, on="htno", how="left"))
+    return frame[columns]
+
+
+def iter_batches(students: Iterable[Dict], table: str,
+                 batch_students: int = EXPORT_BATCH_STUDENTS) -> Iterator[pd.DataFrame]:
+    """Consumes `students` lazily and yields one DataFrame per `batch_students` students."""
+    batch: List[Dict] = []
+    for student in students:
+        batch.append(student)
+        if len(batch) >= batch_students:
+            frame = batch_frame(batch, table)
+            batch = []
+            if not frame.empty:
+                yield frame
+    if batch:
+        frame = batch_frame(batch, table)
+        if not frame.empty:
+            yield frame
+
+
+def stream_csv(batches: Iterable[pd.DataFrame], table: str) -> Iterator[bytes]:
+    # The header goes out first so an empty cohort still gives a valid file
+    yield (",".join(EXPORT_TABLES[table]) + "\n").encode("utf-8")
+    for batch in batches:
+        yield batch.to_csv(index=False, header=False).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain()."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def parquet_schema(table: str):
+    import pyarrow as pa
+
+    types = {
+        "htno": pa.string(), "name": pa.string(), "year": pa.int8(), "sem": pa.int8(),
+        "subject_code": pa.string(), "subject_name": pa.string(), "grade": pa.string(),
+        "credits": pa.float32(), "grade_points": pa.int8(), "sgpa": pa.float64(), "cgpa": pa.float64(),
+    }
+    return pa.schema([(col, types[col]) for col in EXPORT_TABLES[table]])
+
+
+def stream_parquet(batches: Iterable[pd.DataFrame], table: str) -> Iterator[bytes]:
+    """Writes each batch as one Parquet row group and yields the bytes as soon as they are written."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema(table)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            writer.write_table(pa.Table.from_pandas(batch, schema=schema, preserve_index=False))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
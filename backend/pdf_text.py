@@ -0,0 +1,138 @@
+import io
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Text extraction backends tried in order by AcademicProcessor.parse_pdf; a later one is only
+# used when the previous output leaves lines ending in a grade and credits unparsed.
+# pypdfium2 and pdfminer.six are already installed as pdfplumber dependencies.
+PDF_TEXT_BACKENDS = os.environ.get("PDF_TEXT_BACKENDS", "pypdfium2,pdfplumber")
+# Optional crop box "x0,top,x1,bottom" as fractions of the page (origin top-left), e.g.
+# "0,0,1,0.85" to skip the signature/legend footer. Keep the header rows inside it:
+# they hold the name and hall ticket number.
+PDF_TEXT_REGION = os.environ.get("PDF_TEXT_REGION", "")
+
+Region = Tuple[float, float, float, float]
+
+
+def parse_region(value: Optional[str]) -> Optional[Region]:
+    """'0,0.1,1,0.9' -> (0.0, 0.1, 1.0, 0.9); empty means the whole page."""
+    if not value or not value.strip():
+        return None
+    parts = [float(p) for p in value.split(",")]
+    if len(parts) != 4:
+        raise ValueError("PDF text region must be 'x0,top,x1,bottom'")
+    x0, top, x1, bottom = parts
+    if not (0 <= x0 < x1 <= 1 and 0 <= top < bottom <= 1):
+        raise ValueError("PDF text region must be fractions of the page with x0 < x1 and top < bottom")
+    return x0, top, x1, bottom
+
+
+DEFAULT_REGION = parse_region(PDF_TEXT_REGION)
+
+
+def read_pdf_bytes(pdf_file) -> bytes:
+    """Accepts a path or a file-like object, like pdfplumber.open."""
+    if hasattr(pdf_file, "read"):
+        return pdf_file.read()
+    return Path(pdf_file).read_bytes()
+
+
+def _pypdfium2_text(data: bytes, region: Optional[Region]) -> str:
+    import pypdfium2 as pdfium
+
+    pages = []
+    doc = pdfium.PdfDocument(data)
+    try:
+        for page in doc:
+            textpage = page.get_textpage()
+            if region:
+                # PDFium uses PDF coordinates, with the origin at the bottom-left
+                width, height = page.get_size()
+                x0, top, x1, bottom = region
+                text = textpage.get_text_bounded(left=x0 * width, bottom=(1 - bottom) * height,
+                                                 right=x1 * width, top=(1 - top) * height)
+            else:
+                text = textpage.get_text_range()
+            pages.append(text.replace("\r\n", "\n"))
+    finally:
+        doc.close()
+    return "\n".join(pages)
+
+
+def _pdfminer_text(data: bytes, region: Optional[Region]) -> str:
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LAParams, LTTextContainer, LTTextLine
+
+    # boxes_flow=None skips the costly reading-order analysis between text boxes
+    laparams = LAParams(boxes_flow=None, detect_vertical=False)
+    pages = []
+    for layout in extract_pages(io.BytesIO(data), laparams=laparams):
+        lines = []
+        for element in layout:
+            if not isinstance(element, LTTextContainer):
+                continue
+            for line in element:
+                if isinstance(line, LTTextLine):
+                    lines.append(line)
+        if region:
+            x0, top, x1, bottom = region
+            left, page_bottom, right, page_top = layout.bbox
+            width, height = right - left, page_top - page_bottom
+            lines = [l for l in lines
+                     if l.x0 >= left + x0 * width and l.x1 <= left + x1 * width
+                     and l.y1 <= page_top - top * height and l.y0 >= page_top - bottom * height]
+        lines.sort(key=lambda l: (-round(l.y1), l.x0))
+        pages.append("\n".join(l.get_text().rstrip("\n") for l in lines))
+    return "\n".join(pages)
+
+
+def _pdfplumber_text(data: bytes, region: Optional[Region]) -> str:
+    import pdfplumber
+
+    pages = []
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages:
+            if region:
+                x0, top, x1, bottom = region
+                page = page.crop((x0 * page.width, top * page.height, x1 * page.width, bottom * page.height))
+            pages.append(page.extract_text() or "")
+    return "\n".join(pages)
+
+
+EXTRACTORS: Dict[str, Callable[[bytes, Optional[Region]], str]] = {
+    "pypdfium2": _pypdfium2_text,
+    "pdfminer": _pdfminer_text,
+    "pdfplumber": _pdfplumber_text,
+}
+
+
+def configured_backends(value: str = PDF_TEXT_BACKENDS) -> List[str]:
+    backends = [b.strip() for b in value.split(",") if b.strip()]
+    unknown = [b for b in backends if b not in EXTRACTORS]
+    if unknown:
+        raise ValueError(f"Unknown PDF text backend(s) {unknown}, expected any of {sorted(EXTRACTORS)}")
+    return backends
+
+
+def iter_extractions(data: bytes, backends: Optional[List[str]] = None,
+                     region: Optional[Region] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Yields (backend, text) for each backend in order. The caller stops as soon as the
+    text is good enough, so slower backends only run when a faster one fell short.
+    Backends that are not installed or fail on the document are skipped.
+    """
+    for name in backends or configured_backends():
+        try:
+            text = EXTRACTORS[name](data, region)
+        except ImportError:
+            logger.debug(f"PDF text backend {name} is not installed")
+            continue
+        except Exception as e:
+            logger.warning(f"PDF text backend {name} failed: {e}")
+            continue
+        yield name, text
+
@@ -0,0 +1,162 @@
+import cProfile
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Configuration (environment driven so it can be flipped on in production without a rebuild)
+PROFILE_ADMIN_TOKEN = os.environ.get("PROFILE_ADMIN_TOKEN", "")
+PROFILE_SAMPLE_PERCENT = float(os.environ.get("PROFILE_SAMPLE_PERCENT", "0"))
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", "profiles"))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DETERMINISTIC = os.environ.get("PROFILE_DETERMINISTIC", "0") == "1"
+
+PROFILE_TOKEN_HEADER = "x-profile-token"
+
+
+class StackSampler:
+    """
+    Sampling profiler that periodically snapshots the stacks of every thread.
+
+    Playwright scrapes run in executor threads and the async handlers run on the
+    event loop thread, so all threads are sampled rather than just the caller: the
+    profile is process-wide and includes whatever other requests were running.
+    Each stack starts with its thread name, and stacks are kept in collapsed form
+    ("thread;outer;inner;leaf") ready for flamegraph.pl or speedscope.
+    """
+
+    SCOPE = "process"
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = max(interval_ms, 0.5) / 1000.0
+        self.stacks: Counter = Counter()
+        self.sample_count = 0
+        self.thread_names: Set[str] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        thread_names = {}
+        while not self._stop.is_set():
+            for t in threading.enumerate():
+                thread_names[t.ident] = t.name
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                    frame = frame.f_back
+                name = thread_names.get(ident, str(ident))
+                self.thread_names.add(name)
+                stack.append(name)
+                self.stacks[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+            self._stop.wait(self.interval)
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """
+    Decides whether a request should be profiled and writes the results to PROFILE_DIR.
+
+    A request is profiled when it carries a matching X-Profile-Token header or
+    when it falls into the random PROFILE_SAMPLE_PERCENT of traffic.
+    """
+
+    # cProfile can only profile one request at a time on the event loop thread
+    _deterministic_lock = threading.Lock()
+
+    def __init__(self, admin_token: str = PROFILE_ADMIN_TOKEN,
+                 sample_percent: float = PROFILE_SAMPLE_PERCENT,
+                 output_dir: Path = PROFILE_DIR,
+                 deterministic: bool = PROFILE_DETERMINISTIC):
+        self.admin_token = admin_token
+        self.sample_percent = sample_percent
+        self.output_dir = Path(output_dir)
+        self.deterministic = deterministic
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.admin_token) or self.sample_percent > 0
+
+    def should_profile(self, headers) -> Optional[str]:
+        """Returns the trigger reason ('token' or 'sample'), or None to skip."""
+        supplied = headers.get(PROFILE_TOKEN_HEADER)
+        if supplied and self.admin_token and hmac.compare_digest(supplied, self.admin_token):
+            return "token"
+        if self.sample_percent > 0 and random.random() * 100 < self.sample_percent:
+            return "sample"
+        return None
+
+    def start(self, request_id: str) -> Dict:
+        """
+        Starts profiling a request. The profile id is the request id plus a server-generated
+        suffix, so a client reusing an X-Request-ID never overwrites an earlier profile.
+        """
+        # The id becomes a file name inside output_dir: no separators, no hidden or relative names
+        if not request_id or request_id.startswith(".") or "/" in request_id or "\\" in request_id:
+            raise ValueError(f"Unsafe request id for a profile: {request_id!r}")
+        session = {"sampler": StackSampler(), "cprofile": None, "started": time.perf_counter(),
+                   "request_id": request_id, "profile_id": f"{request_id}-{uuid.uuid4().hex[:8]}"}
+        if self.deterministic and self._deterministic_lock.acquire(blocking=False):
+            session["cprofile"] = cProfile.Profile()
+            session["cprofile"].enable()
+        session["sampler"].start()
+        return session
+
+    def finish(self, session: Dict, meta: Dict) -> str:
+        """Stops profiling and writes <profile_id>.collapsed / .json (/ .prof) files. Returns the profile id."""
+        elapsed_ms = (time.perf_counter() - session["started"]) * 1000
+        request_id, profile_id = session["request_id"], session["profile_id"]
+        sampler = session["sampler"]
+        sampler.stop()
+        prof = session["cprofile"]
+        if prof is not None:
+            prof.disable()
+            self._deterministic_lock.release()
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if prof is not None:
+            prof.dump_stats(str(self.output_dir / f"{profile_id}.prof"))
+
+        (self.output_dir / f"{profile_id}.collapsed").write_text(sampler.collapsed())
+        summary = {
+            **meta,
+            "request_id": request_id,
+            "profile_id": profile_id,
+            "elapsed_ms": round(elapsed_ms, 2),
+            "samples": sampler.sample_count,
+            "interval_ms": sampler.interval * 1000,
+            # Every thread is sampled, so concurrent requests show up in this profile too
+            "sample_scope": sampler.SCOPE,
+            "sampled_threads": sorted(sampler.thread_names),
+            "deterministic": prof is not None,
+            "created_at": time.time(),
+        }
+        (self.output_dir / f"{profile_id}.json").write_text(json.dumps(summary, indent=2))
+        logger.info(f"Profile for {meta.get('path')} written to {self.output_dir / profile_id}.*")
+        return profile_id
@@ -0,0 +1,149 @@
+import threading
+import time
+from typing import Dict, Optional
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a request has used up its time budget."""
+
+
+class Deadline:
+    """
+    Time budget for one request, shared by all of its stages.
+
+    Each stage asks for the remaining time instead of using its own fixed
+    timeout, so a slow first stage leaves less time for the later ones.
+    """
+
+    def __init__(self, budget_seconds: float):
+        self.budget = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+
+    def remaining(self) -> float:
+        remaining = self.expires_at - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"Request exceeded its {self.budget:.0f}s time budget")
+        return remaining
+
+    def remaining_ms(self, cap_ms: Optional[float] = None) -> float:
+        # Playwright treats a timeout of 0 as "wait forever", so never hand out 0
+        ms = max(1.0, self.remaining() * 1000)
+        return min(ms, cap_ms) if cap_ms is not None else ms
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures.
+    Open -> half-open after `recovery_timeout` seconds, letting `half_open_max_calls` probes through.
+    Half-open -> closed on a successful probe, back to open on a failed one.
+
+    Callers must report the outcome of every allowed call with record_success(),
+    record_failure() or release() (call abandoned before reaching upstream). A probe
+    nobody reports on is expired after another `recovery_timeout`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_in_flight = 0
+        self._probe_started_at: Optional[float] = None
+
+        # Counters for monitoring
+        self.trip_count = 0
+        self.rejected_count = 0
+        self.success_count = 0
+        self.failure_count = 0
+        self.last_failure_at: Optional[float] = None
+        self.last_trip_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_in_flight = 0
+
+    def _trip(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._half_open_in_flight = 0
+        self.trip_count += 1
+        self.last_trip_at = time.time()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN:
+                # A probe whose caller never reported back must not keep the breaker half-open forever
+                if (self._half_open_in_flight and self._probe_started_at is not None
+                        and time.monotonic() - self._probe_started_at >= self.recovery_timeout):
+                    self._half_open_in_flight = 0
+                if self._half_open_in_flight < self.half_open_max_calls:
+                    self._half_open_in_flight += 1
+                    self._probe_started_at = time.monotonic()
+                    return True
+            self.rejected_count += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.success_count += 1
+            self._consecutive_failures = 0
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._half_open_in_flight = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failure_count += 1
+            self._consecutive_failures += 1
+            self.last_failure_at = time.time()
+            if self._state == self.HALF_OPEN:
+                self._trip()
+            elif self._state == self.CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._trip()
+
+    def release(self):
+        """Gives back a half-open probe slot for a call that never reached upstream."""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._half_open_in_flight > 0:
+                self._half_open_in_flight -= 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            self._maybe_half_open()
+            retry_in = None
+            if self._state == self.OPEN:
+                retry_in = round(max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at)), 1)
+            return {
+                "name": self.name,
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout": self.recovery_timeout,
+                "retry_in_seconds": retry_in,
+                "trip_count": self.trip_count,
+                "rejected_count": self.rejected_count,
+                "success_count": self.success_count,
+                "failure_count": self.failure_count,
+                "last_failure_at": self.last_failure_at,
+                "last_trip_at": self.last_trip_at,
+            }
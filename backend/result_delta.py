@@ -0,0 +1,89 @@
+import hashlib
+import json
+from typing import Dict, List, Tuple
+
+# Fields of a subject row that make up its content (htno is the same for every row)
+SUBJECT_FIELDS = ("subject_code", "subject_name", "grade", "credits", "grade_points", "year", "sem",
+                  "internal", "external", "total", "official_sem_sgpa")
+
+# Keys of a delta response holding row lists, so columnar encoding applies to them
+DELTA_TABLE_KEYS = ("added_subjects", "changed_subjects", "removed_subjects", "semesters")
+
+
+def result_version(result: Dict) -> str:
+    """Content hash of a /fetch/htno result, used as its ETag."""
+    canonical = {
+        "subjects": [{k: s.get(k) for k in SUBJECT_FIELDS} for s in result.get("subjects", [])],
+        "official_cgpa": result.get("official_cgpa"),
+        "student_name": result.get("student_name"),
+    }
+    digest = hashlib.sha256(json.dumps(canonical, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+def _keyed_subjects(result: Dict) -> Dict[Tuple, Dict]:
+    # A supplementary attempt repeats (year, sem, code), so the attempt number is part of the key
+    attempts: Dict[Tuple, int] = {}
+    keyed = {}
+    for s in result.get("subjects", []):
+        base = (s.get("year"), s.get("sem"), s.get("subject_code"))
+        attempts[base] = attempts.get(base, 0) + 1
+        keyed[base + (attempts[base],)] = s
+    return keyed
+
+
+def _semester_sgpas(result: Dict) -> Dict[Tuple, float]:
+    sgpas = {}
+    for s in result.get("subjects", []):
+        if s.get("official_sem_sgpa") is not None:
+            sgpas[(s["year"], s["sem"])] = s["official_sem_sgpa"]
+    return sgpas
+
+
+def diff_results(old: Dict, new: Dict) -> Dict:
+    """
+    Subject and semester level changes from `old` to `new`:
+    new subjects (new semester or supplementary attempt), changed grades/marks,
+    removed rows and semesters whose official SGPA appeared or changed.
+    """
+    old_subjects, new_subjects = _keyed_subjects(old), _keyed_subjects(new)
+
+    added: List[Dict] = []
+    changed: List[Dict] = []
+    for key, subject in new_subjects.items():
+        previous = old_subjects.get(key)
+        if previous is None:
+            added.append(subject)
+        elif any(previous.get(f) != subject.get(f) for f in SUBJECT_FIELDS):
+            changed.append({**subject, "previous_grade": previous.get("grade")})
+    removed = [s for key, s in old_subjects.items() if key not in new_subjects]
+
+    old_sgpa, new_sgpa = _semester_sgpas(old), _semester_sgpas(new)
+    semesters = [
+        {"year": year, "sem": sem, "sgpa": sgpa, "previous_sgpa": old_sgpa.get((year, sem))}
+        for (year, sem), sgpa in sorted(new_sgpa.items())
+        if old_sgpa.get((year, sem)) != sgpa
+    ]
+
+    return {
+        "added_subjects": added,
+        "changed_subjects": changed,
+        "removed_subjects": removed,
+        "semesters": semesters,
+    }
+
+
+def build_delta_response(old: Dict, new: Dict, base_version: str, version: str) -> Dict:
+    delta = diff_results(old, new) if base_version != version else {k: [] for k in DELTA_TABLE_KEYS}
+    return {
+        "success": True,
+        "delta": True,
+        "unchanged": base_version == version,
+        "base_version": base_version,
+        "version": version,
+        "htno": new.get("htno"),
+        "student_name": new.get("student_name"),
+        "official_cgpa": new.get("official_cgpa"),
+        "total_subjects": new.get("total_subjects"),
+        **delta,
+    }
@@ -0,0 +1,278 @@
+import re
+from typing import Dict
+
+from bs4 import BeautifulSoup
+
+
+class ResultNotFoundError(Exception):
+    """Raised when a results page has no usable result for the hall ticket."""
+
+
+class ResultPageError(ResultNotFoundError):
+    """Raised when a page has no result tables at all: an error or half-rendered page, not a missing hall ticket."""
+
+
+def get_grade_points(grade: str) -> int:
+    """Convert grade to grade points."""
+    grade_map = {
+        "O": 10, "A+": 9, "A": 8, "B+": 7, "B": 6, "C": 5, "D": 4,
+        "F": 0, "Ab": 0, "-": 0
+    }
+    return grade_map.get(grade, 0)
+
+
+def parse_result_html(html_content: str, htno: str) -> Dict:
+    """
+    Parses a rendered jntuhresults page into the /fetch/htno response payload.
+
+    Raises:
+        ResultNotFoundError: page reports the hall ticket as missing or has no subject rows
+    """
+    # Parse with BeautifulSoup
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    # Check for error in page
+    page_text = soup.get_text().lower()
+    if "not found" in page_text or "invalid" in page_text:
+        raise ResultNotFoundError("Hall ticket number not found.")
+
+    # Find all tables
+    tables = soup.find_all('table')
+
+    if len(tables) < 2:
+        raise ResultPageError("No result tables found. Please verify the hall ticket number or try PDF upload.")
+
+    # First table is student info
+    student_name = ""
+    student_table = tables[0]
+    for cell in student_table.find_all(['td', 'th']):
+        text = cell.get_text(strip=True)
+        # Name is usually all uppercase letters, 5+ chars
+        if len(text) > 5 and text.isupper() and text.replace(" ", "").isalpha():
+            student_name = text
+            break
+
+    # Parse semester tables (tables 1+)
+    subjects = []
+    current_year = 1
+    current_sem = 1
+
+    for table in tables[1:]:
+        rows = table.find_all('tr')
+        if not rows: continue
+
+        # Dynamic Column Mapping
+        header_map = {}
+        header_row = rows[0]
+        header_cells = header_row.find_all(['td', 'th'])
+
+        # If first row looks like data (no headers), assume standard R18 format
+        # Standard: Code, Name, Internal, External, Total, Grade, Credits
+        if len(header_cells) > 0 and header_cells[0].get_text(strip=True).upper() != "SUBJECT CODE":
+             header_map = {0: 'code', 1: 'name', 2: 'internal', 3: 'external', 4: 'total', 5: 'grade', 6: 'credits'}
+             start_row_idx = 0
+        else:
+            # Map headers to indices
+            for idx, cell in enumerate(header_cells):
+                txt = cell.get_text(strip=True).upper()
+                if "CODE" in txt: header_map[idx] = 'code'
+                elif "NAME" in txt: header_map[idx] = 'name'
+                elif "INT" in txt: header_map[idx] = 'internal'
+                elif "EXT" in txt: header_map[idx] = 'external'
+                elif "TOT" in txt: header_map[idx] = 'total'
+                elif "GRADE" in txt and "POINT" not in txt: header_map[idx] = 'grade' # Avoid Grade Points
+                elif "CREDIT" in txt or txt == "C" or txt == "CR" or "CRD" in txt: header_map[idx] = 'credits'
+            start_row_idx = 1
+
+        for row in rows[start_row_idx:]:
+            # Get all cells (td or th)
+            cells = row.find_all(['td', 'th'])
+
+            # Parse semester headers dynamically
+            # Search for the header immediately preceding the table
+            # Headers are usually in <b>, <h4>, <h5>, or <p> tags
+            # Example text: "IV Year I Semester" or "1-1"
+
+            header_text = ""
+            prev_element = table.find_previous(['b', 'h4', 'h5', 'p', 'center'])
+            if prev_element:
+                header_text = prev_element.get_text(strip=True)
+
+            # Try to parse year/sem from header
+            parsed_sem = None
+
+            # Regex for "IV Year I Semester" or "IV YEAR I SEMESTER"
+            roman_map = {'I': 1, 'II': 2, 'III': 3, 'IV': 4}
+            roman_match = re.search(r"(I{1,4}|IV)\s*Year\s*(I{1,2})\s*Semester", header_text, re.IGNORECASE)
+            if roman_match:
+                y_str, s_str = roman_match.groups()
+                parsed_sem = (roman_map.get(y_str.upper(), 0), roman_map.get(s_str.upper(), 0))
+
+            # Regex for "1-1", "1-2" etc
+            if not parsed_sem:
+                num_match = re.search(r"(\d)\s*-\s*(\d)", header_text)
+                if num_match:
+                    parsed_sem = (int(num_match.group(1)), int(num_match.group(2)))
+
+            if parsed_sem:
+                current_year, current_sem = parsed_sem
+            else:
+                # Fallback to sequential logic if parsing fails (but log/warn internally if needed)
+                # We only increment if we didn't find a header, to maintain legacy behavior for weird pages
+                pass
+
+            # Check for SGPA row (marks end of semester)
+            if cells:
+                first_text = cells[0].get_text(strip=True)
+                if "SGPA" in first_text:
+                    # Extract SGPA value (e.g. "SGPA : 8.69")
+                    try:
+                        # Try to find a float in the text
+                        sgpa_match = re.search(r"(\d+\.\d+)", first_text)
+                        if not sgpa_match and len(cells) > 1:
+                            sgpa_match = re.search(r"(\d+\.\d+)", cells[1].get_text(strip=True))
+
+                        if sgpa_match:
+                            official_sgpa = float(sgpa_match.group(1))
+
+                            # Attach this SGPA to all subjects of the CURRENT detected semester
+                            # Since we parse the header BEFORE the table, current_year/sem are correct for THIS table.
+                            for s in reversed(subjects):
+                                if s['year'] == min(current_year, 4) and s['sem'] == current_sem:
+                                    s['official_sem_sgpa'] = official_sgpa
+                                else:
+                                    # Stop if we hit a subject from a different semester (optimization)
+                                    break 
+                    except:
+                        pass
+
+                    # For sequential fallback logic: Move to next semester ONLY if we rely on it
+                    # But with dynamic parsing, we don't strictly need to increment.
+                    # However, for tables WITHOUT headers, we might still need it.
+                    if not parsed_sem:
+                        if current_sem == 1:
+                            current_sem = 2
+                        else:
+                            current_year += 1
+                            current_sem = 1
+                    continue
+
+            # Parse subject row using map
+            code = name = grade = ""
+            internal = external = total = None
+            credits = None
+
+            # If map failed (empty), fallback to index based
+            if not header_map and len(cells) >= 7:
+                 header_map = {0: 'code', 1: 'name', 2: 'internal', 3: 'external', 4: 'total', 5: 'grade', 6: 'credits'}
+
+            for idx, cell in enumerate(cells):
+                if idx not in header_map: continue
+                val = cell.get_text(strip=True)
+                field = header_map[idx]
+
+                if field == 'code': code = val
+                elif field == 'name': name = val
+                elif field == 'grade': grade = val
+                elif field == 'internal': 
+                    try: internal = int(val) 
+                    except: pass
+                elif field == 'external':
+                    try: external = int(val)
+                    except: pass
+                elif field == 'total':
+                    try: total = int(val)
+                    except: pass
+                elif field == 'credits':
+                    try: 
+                        c = float(val)
+                        if 0 <= c <= 10: credits = c
+                    except: pass
+
+            # Safety net: If credits still None, try scanning typical columns (6 or 7) for float values
+            if credits is None and len(cells) >= 7:
+                # Look for a small float in any column after index 5
+                for i in range(5, len(cells)):
+                    try:
+                        val = cells[i].get_text(strip=True)
+                        c = float(val)
+                        # Credits are usually {0, 1, 1.5, 2, 3, 4}
+                        if c in [0.0, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0]:
+                            credits = c
+                            break
+                    except: pass
+
+            # Smart credit fallback based on subject type
+            if credits is None:  
+                name_lower = name.lower() if name else ""
+                code_lower = code.lower() if code else ""
+
+                # Labs typically have 1-1.5 credits
+                if "lab" in name_lower or code_lower.endswith("l"):
+                    credits = 1.5
+                # Workshops and skill courses
+                elif "workshop" in name_lower or "skill" in name_lower:
+                    credits = 1.0
+                # Projects
+                elif "project" in name_lower or "seminar" in name_lower:
+                    credits = 2.0
+                # Theory subjects with tutorials (usually 4 credits)
+                elif "mathematics" in name_lower or "calculus" in name_lower or "statistics" in name_lower:
+                    credits = 4.0
+                # Regular theory subjects (default 3 credits)
+                else:
+                    credits = 3.0
+
+            # Fallback for Grade if not mapped (sometimes header says 'Gr')
+            if not grade:
+                for cell in cells:
+                    val = cell.get_text(strip=True)
+                    if val in ['O', 'A+', 'A', 'B+', 'B', 'C', 'F', 'Ab']:
+                         grade = val; break
+
+            # Valid subject check
+            if code and name and grade and len(code) < 15:
+
+
+                if code and code != "Subject Code":
+                    subject_data = {
+                        "subject_code": code,
+                        "subject_name": name,
+                        "grade": grade,
+                        "credits": credits if credits is not None else 3.0,
+                        "grade_points": get_grade_points(grade),
+                        "year": min(current_year, 4),
+                        "sem": current_sem,
+                        "htno": htno
+                    }
+                    # Add marks if available
+                    if internal is not None:
+                        subject_data["internal"] = internal
+                    if external is not None:
+                        subject_data["external"] = external
+                    if total is not None:
+                        subject_data["total"] = total
+
+                    subjects.append(subject_data)
+
+    if not subjects:
+        raise ResultNotFoundError("Could not extract subject data. Please try PDF upload instead.")
+
+    # Try to find overall CGPA in page text
+    official_cgpa = None
+    try:
+        # Look for "CGPA : 7.69" pattern
+        cgpa_match = re.search(r"CGPA\s*[:\-]?\s*(\d+\.\d+)", page_text, re.IGNORECASE)
+        if cgpa_match:
+            official_cgpa = float(cgpa_match.group(1))
+    except:
+        pass
+
+    return {
+        "success": True,
+        "htno": htno,
+        "student_name": student_name,
+        "subjects": subjects,
+        "total_subjects": len(subjects),
+        "official_cgpa": official_cgpa
+    }
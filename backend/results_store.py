@@ -0,0 +1,284 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from backend.data_processor import AcademicProcessor
+
+# Parsed results from /fetch/htno and /analyze/pdf are kept here for cohort queries.
+# Set RESULTS_DB_PATH to an empty string to disable the store.
+RESULTS_DB_PATH = os.environ.get("RESULTS_DB_PATH", "data/results.sqlite3")
+
+BACKLOG_GRADES = ("F", "Ab")
+
+# Full /fetch/htno payloads kept per student so delta refreshes can diff against what a client holds
+RESULT_VERSIONS_KEPT = int(os.environ.get("RESULT_VERSIONS_KEPT", "5"))
+
+# Default SGPA histogram edges; the last bin includes 10.0
+SGPA_BINS = [0, 5, 6, 7, 8, 9, 10]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    htno TEXT PRIMARY KEY,
+    name TEXT,
+    batch TEXT,
+    college_code TEXT,
+    branch_code TEXT,
+    cgpa REAL,
+    official_cgpa REAL,
+    source TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_students_cohort ON students (batch, college_code, branch_code);
+
+CREATE TABLE IF NOT EXISTS semesters (
+    htno TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    sem INTEGER NOT NULL,
+    sgpa REAL,
+    official_sgpa REAL,
+    credits REAL,
+    PRIMARY KEY (htno, year, sem)
+);
+CREATE INDEX IF NOT EXISTS idx_semesters_sem ON semesters (year, sem, sgpa);
+
+CREATE TABLE IF NOT EXISTS subjects (
+    htno TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    sem INTEGER NOT NULL,
+    subject_code TEXT NOT NULL,
+    attempt INTEGER NOT NULL,
+    subject_name TEXT,
+    grade TEXT,
+    credits REAL,
+    grade_points INTEGER,
+    is_latest INTEGER NOT NULL,
+    PRIMARY KEY (htno, year, sem, subject_code, attempt)
+);
+CREATE INDEX IF NOT EXISTS idx_subjects_code ON subjects (subject_code, is_latest, grade, htno);
+CREATE INDEX IF NOT EXISTS idx_subjects_sem ON subjects (year, sem);
+
+CREATE TABLE IF NOT EXISTS result_versions (
+    htno TEXT NOT NULL,
+    version TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL,
+    PRIMARY KEY (htno, version)
+);
+"""
+
+
+def split_htno(htno: str) -> Dict[str, Optional[str]]:
+    """
+    Splits a JNTUH hall ticket (e.g. 20B91A0501) into its cohort parts:
+    admission batch "20", college code "B9", branch code "05".
+    """
+    htno = htno.upper()
+    if len(htno) < 10:
+        return {"batch": None, "college_code": None, "branch_code": None}
+    return {"batch": htno[0:2], "college_code": htno[2:4], "branch_code": htno[6:8]}
+
+
+def _finite(value) -> Optional[float]:
+    if value is None:
+        return None
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _prefix_range(prefix: str):
+    """Turns a prefix match into a range scan the primary key index can answer."""
+    return prefix, prefix + "\uffff"
+
+
+class ResultsStore:
+    """Embedded SQLite store of parsed student results."""
+
+    def __init__(self, path: str = RESULTS_DB_PATH):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def upsert_result(self, htno: str, subjects: List[Dict], name: str = "", source: str = "fetch",
+                      official_cgpa: Optional[float] = None):
+        """
+        Stores one parsed result. Semesters present in `subjects` replace what was stored
+        for them; other semesters are kept, so single-semester PDFs add up over time.
+        """
+        htno = htno.upper()
+        if not subjects:
+            return
+
+        official_sgpa = {}
+        attempts: Dict[tuple, int] = {}
+        rows = []
+        for s in subjects:
+            year, sem, code = int(s["year"]), int(s["sem"]), str(s["subject_code"])
+            if s.get("official_sem_sgpa") is not None:
+                official_sgpa[(year, sem)] = s["official_sem_sgpa"]
+            # Supplementary attempts repeat the subject code; later rows are later attempts
+            attempt = attempts.get((year, sem, code), 0) + 1
+            attempts[(year, sem, code)] = attempt
+            rows.append((htno, year, sem, code, attempt, s.get("subject_name"), s.get("grade"),
+                         _finite(s.get("credits")), int(s.get("grade_points") or 0)))
+
+        parts = split_htno(htno)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            for year, sem in {(r[1], r[2]) for r in rows}:
+                conn.execute("DELETE FROM subjects WHERE htno = ? AND year = ? AND sem = ?", (htno, year, sem))
+            conn.executemany(
+                "INSERT INTO subjects (htno, year, sem, subject_code, attempt, subject_name, grade, credits, "
+                "grade_points, is_latest) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [r + (int(r[4] == attempts[(r[1], r[2], r[3])]),) for r in rows],
+            )
+
+            # Recompute aggregates over everything stored for this student with AcademicProcessor's formula
+            stored = [dict(r) for r in conn.execute(
+                "SELECT year, sem, subject_code, grade, credits, grade_points FROM subjects WHERE htno = ?", (htno,))]
+            processor = AcademicProcessor.from_subjects(stored)
+            for sem_row in processor.semesters_df.to_dict(orient="records"):
+                key = (int(sem_row["year"]), int(sem_row["sem"]))
+                conn.execute(
+                    "INSERT INTO semesters (htno, year, sem, sgpa, official_sgpa, credits) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (htno, year, sem) DO UPDATE SET sgpa = excluded.sgpa, credits = excluded.credits, "
+                    "official_sgpa = COALESCE(excluded.official_sgpa, semesters.official_sgpa)",
+                    (htno, key[0], key[1], _finite(sem_row["sgpa"]), official_sgpa.get(key), _finite(sem_row["credits"])),
+                )
+
+            conn.execute(
+                "INSERT INTO students (htno, name, batch, college_code, branch_code, cgpa, official_cgpa, source, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (htno) DO UPDATE SET "
+                "name = COALESCE(NULLIF(excluded.name, ''), students.name), cgpa = excluded.cgpa, "
+                "official_cgpa = COALESCE(excluded.official_cgpa, students.official_cgpa), "
+                "source = excluded.source, updated_at = excluded.updated_at",
+                (htno, name, parts["batch"], parts["college_code"], parts["branch_code"],
+                 _finite(processor.get_cgpa()), official_cgpa, source, now),
+            )
+
+    def save_version(self, htno: str, version: str, payload: Dict, keep: int = RESULT_VERSIONS_KEPT):
+        """Remembers one served result under its version, keeping the `keep` most recent per student."""
+        htno = htno.upper()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO result_versions (htno, version, payload, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (htno, version) DO UPDATE SET created_at = excluded.created_at",
+                (htno, version, json.dumps(payload), time.time()),
+            )
+            conn.execute(
+                "DELETE FROM result_versions WHERE htno = ? AND version NOT IN "
+                "(SELECT version FROM result_versions WHERE htno = ? ORDER BY created_at DESC LIMIT ?)",
+                (htno, htno, keep),
+            )
+
+    def get_version(self, htno: str, version: str) -> Optional[Dict]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT payload FROM result_versions WHERE htno = ? AND version = ?",
+                               (htno.upper(), version)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_student(self, htno: str) -> Optional[Dict]:
+        htno = htno.upper()
+        with closing(self._connect()) as conn:
+            student = conn.execute("SELECT * FROM students WHERE htno = ?", (htno,)).fetchone()
+            if student is None:
+                return None
+            semesters = conn.execute("SELECT year, sem, sgpa, official_sgpa, credits FROM semesters "
+                                     "WHERE htno = ? ORDER BY year, sem", (htno,)).fetchall()
+            subjects = conn.execute("SELECT year, sem, subject_code, subject_name, grade, credits, grade_points, "
+                                    "attempt, is_latest FROM subjects WHERE htno = ? ORDER BY year, sem, rowid",
+                                    (htno,)).fetchall()
+        return {**dict(student), "semesters": [dict(r) for r in semesters], "subjects": [dict(r) for r in subjects]}
+
+    def _cohort_filter(self, alias: str, htno_prefix: Optional[str], batch: Optional[str],
+                       college_code: Optional[str], branch_code: Optional[str]):
+        clauses, params = [], []
+        if htno_prefix:
+            low, high = _prefix_range(htno_prefix.upper())
+            clauses.append(f"{alias}.htno >= ? AND {alias}.htno < ?")
+            params += [low, high]
+        for column, value in (("batch", batch), ("college_code", college_code), ("branch_code", branch_code)):
+            if value:
+                clauses.append(f"st.{column} = ?")
+                params.append(value.upper())
+        return clauses, params
+
+    def find_students(self, htno_prefix: Optional[str] = None, batch: Optional[str] = None,
+                      college_code: Optional[str] = None, branch_code: Optional[str] = None,
+                      backlog_subject: Optional[str] = None, has_backlog: Optional[bool] = None,
+                      limit: int = 1000) -> List[Dict]:
+        """Students in a cohort, optionally only those with a current backlog (in one subject or any)."""
+        clauses, params = self._cohort_filter("st", htno_prefix, batch, college_code, branch_code)
+        grades = ",".join("?" * len(BACKLOG_GRADES))
+        if backlog_subject:
+            clauses.append(f"st.htno IN (SELECT htno FROM subjects WHERE subject_code = ? AND is_latest = 1 "
+                           f"AND grade IN ({grades}))")
+            params += [backlog_subject.upper(), *BACKLOG_GRADES]
+        if has_backlog is not None:
+            op = "IN" if has_backlog else "NOT IN"
+            clauses.append(f"st.htno {op} (SELECT htno FROM subjects WHERE is_latest = 1 AND grade IN ({grades}))")
+            params += list(BACKLOG_GRADES)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (f"SELECT st.htno, st.name, st.batch, st.college_code, st.branch_code, st.cgpa, st.official_cgpa, "
+               f"st.updated_at FROM students st {where} ORDER BY st.htno LIMIT ?")
+        with closing(self._connect()) as conn:
+            return [dict(r) for r in conn.execute(sql, (*params, limit))]
+
+    def sgpa_distribution(self, year: int, sem: int, htno_prefix: Optional[str] = None,
+                          batch: Optional[str] = None, college_code: Optional[str] = None,
+                          branch_code: Optional[str] = None, bins: Optional[List[float]] = None) -> Dict:
+        """Histogram and summary of stored SGPAs for one semester, optionally within a cohort."""
+        bins = sorted(bins or SGPA_BINS)
+        clauses, params = self._cohort_filter("sm", htno_prefix, batch, college_code, branch_code)
+        clauses = ["sm.year = ?", "sm.sem = ?", "sm.sgpa IS NOT NULL"] + clauses
+        sql = (f"SELECT sm.sgpa FROM semesters sm JOIN students st ON st.htno = sm.htno "
+               f"WHERE {' AND '.join(clauses)} ORDER BY sm.sgpa")
+        with closing(self._connect()) as conn:
+            values = [r[0] for r in conn.execute(sql, (year, sem, *params))]
+
+        counts = [0] * (len(bins) - 1)
+        for v in values:
+            for i in range(len(bins) - 1):
+                last = i == len(bins) - 2
+                if bins[i] <= v < bins[i + 1] or (last and v == bins[i + 1]):
+                    counts[i] += 1
+                    break
+
+        n = len(values)
+        median = None
+        if n:
+            median = values[n // 2] if n % 2 else round((values[n // 2 - 1] + values[n // 2]) / 2, 2)
+        return {
+            "semester": f"{year}-{sem}",
+            "count": n,
+            "mean": round(sum(values) / n, 2) if n else None,
+            "median": median,
+            "min": values[0] if n else None,
+            "max": values[-1] if n else None,
+            "bins": [{"from": bins[i], "to": bins[i + 1], "count": counts[i]} for i in range(len(counts))],
+        }
+
+
+def parse_semester(value: str):
+    """'3-1' -> (3, 1)"""
+    match = re.fullmatch(r"\s*([1-4])\s*-\s*([12])\s*", value or "")
+    if not match:
+        raise ValueError("Semester must look like '3-1'")
+    return int(match.group(1)), int(match.group(2))
+
+
+def get_results_store() -> Optional[ResultsStore]:
+    return ResultsStore(RESULTS_DB_PATH) if RESULTS_DB_PATH else None
@@ -0,0 +1,110 @@
+import gzip
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Raw result pages are kept here so parser fixes can be replayed without re-scraping.
+# Set SNAPSHOT_DIR to an empty string to disable archiving.
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "snapshots")
+# Newest pages kept per hall ticket; older ones are deleted on save. 0 keeps everything.
+SNAPSHOT_KEEP_PER_HTNO = int(os.environ.get("SNAPSHOT_KEEP_PER_HTNO", "10"))
+
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S%fZ"
+SNAPSHOT_SUFFIX = ".html.gz"
+
+
+class SnapshotArchive:
+    """
+    Stores raw scraped result pages as gzip files keyed by hall ticket and fetch time.
+
+    Layout: <root>/<HTNO>/<YYYYmmddTHHMMSSffffffZ>.html.gz
+    """
+
+    def __init__(self, root: str = SNAPSHOT_DIR, keep_per_htno: int = SNAPSHOT_KEEP_PER_HTNO):
+        self.root = Path(root)
+        self.keep_per_htno = keep_per_htno
+
+    @staticmethod
+    def _safe_htno(htno: str) -> str:
+        # Hall tickets are alphanumeric; anything else must not reach the file system
+        cleaned = re.sub(r"[^A-Z0-9]", "", htno.upper())
+        if not cleaned:
+            raise ValueError(f"Invalid hall ticket for snapshot: {htno!r}")
+        return cleaned
+
+    def save(self, htno: str, html: str, fetched_at: Optional[datetime] = None) -> Path:
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        folder = self.root / self._safe_htno(htno)
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / f"{fetched_at.strftime(TIMESTAMP_FORMAT)}{SNAPSHOT_SUFFIX}"
+        # Write to a temp name first so a concurrent re-parse never reads half a file
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(gzip.compress(html.encode("utf-8"), compresslevel=6))
+        tmp.replace(path)
+        if self.keep_per_htno > 0:
+            self.prune(htno)
+        return path
+
+    def prune(self, htno: Optional[str] = None, keep: Optional[int] = None) -> int:
+        """
+        Deletes all but the newest `keep` (default keep_per_htno) snapshots of one hall
+        ticket, or of every hall ticket when `htno` is None. Returns the number removed.
+        """
+        keep = self.keep_per_htno if keep is None else keep
+        if keep <= 0:
+            return 0
+        if htno is not None:
+            folders = [self.root / self._safe_htno(htno)]
+        elif self.root.exists():
+            folders = [f for f in self.root.iterdir() if f.is_dir()]
+        else:
+            folders = []
+
+        removed = 0
+        for folder in folders:
+            for path in sorted(folder.glob(f"*{SNAPSHOT_SUFFIX}"))[:-keep]:
+                # Another worker may be pruning the same folder
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def snapshots(self, htno: str) -> list:
+        folder = self.root / self._safe_htno(htno)
+        if not folder.exists():
+            return []
+        return sorted(folder.glob(f"*{SNAPSHOT_SUFFIX}"))
+
+    def latest(self, htno: str) -> Optional[Path]:
+        paths = self.snapshots(htno)
+        return paths[-1] if paths else None
+
+    def iter_snapshots(self, latest_only: bool = True) -> Iterator[Tuple[str, Path]]:
+        """Yields (htno, path) for every archived page, optionally only the newest per hall ticket."""
+        if not self.root.exists():
+            return
+        for folder in sorted(self.root.iterdir()):
+            if not folder.is_dir():
+                continue
+            paths = sorted(folder.glob(f"*{SNAPSHOT_SUFFIX}"))
+            if not paths:
+                continue
+            for path in (paths[-1:] if latest_only else paths):
+                yield folder.name, path
+
+    @staticmethod
+    def read(path: Path) -> str:
+        return gzip.decompress(Path(path).read_bytes()).decode("utf-8")
+
+    @staticmethod
+    def fetched_at(path: Path) -> datetime:
+        stamp = Path(path).name[:-len(SNAPSHOT_SUFFIX)]
+        return datetime.strptime(stamp, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def get_archive() -> Optional[SnapshotArchive]:
+    return SnapshotArchive(SNAPSHOT_DIR) if SNAPSHOT_DIR else None
@@ -0,0 +1,197 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from backend.encoding import accepted_encodings
+
+# Optional: without brotli only .gz variants are built and served
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Build .br/.gz variants of the built frontend when the server starts (skipped when up to date;
+# tools/precompress_dist.py does the same at image build time)
+STATIC_PRECOMPRESS = os.environ.get("STATIC_PRECOMPRESS", "1") == "1"
+# Files smaller than this are served as they are
+STATIC_COMPRESS_MIN_BYTES = int(os.environ.get("STATIC_COMPRESS_MIN_BYTES", "1024"))
+COMPRESSIBLE_SUFFIXES = {".js", ".mjs", ".css", ".html", ".svg", ".json", ".map", ".txt", ".xml", ".wasm", ".ico"}
+
+# Vite names bundles "<name>-<8 char hash>.<ext>"; such a file never changes under the same URL
+HASHED_NAME = re.compile(r"-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# Unhashed files may change on redeploy, so the browser revalidates them (cheap 304s)
+REVALIDATE_CACHE = "no-cache"
+
+# Preferred first
+VARIANTS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def is_precompressed_variant(path: Path) -> bool:
+    """True for a .br/.gz sibling of a built file; those are only sent as Content-Encoding variants."""
+    for _, suffix in VARIANTS:
+        if path.name.endswith(suffix) and path.with_name(path.name[:-len(suffix)]).is_file():
+            return True
+    return False
+
+
+def _encoders():
+    if brotli is not None:
+        yield ".br", lambda data: brotli.compress(data, quality=11)
+    # mtime=0 keeps the output identical across builds
+    yield ".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _atomic_write(path: Path, data: bytes):
+    # Several workers may precompress at once; each writes its own temp file and renames
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def precompress_directory(root: Path, min_bytes: int = STATIC_COMPRESS_MIN_BYTES) -> Dict[str, int]:
+    """
+    Writes <file>.br and <file>.gz next to every compressible file under `root`.
+    Variants newer than their source are kept, and variants that would not be
+    smaller are not written.
+    """
+    stats = {"compressed": 0, "up_to_date": 0}
+    for path in sorted(root.rglob("*")):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        source_stat = path.stat()
+        if source_stat.st_size < min_bytes:
+            continue
+        data = None
+        for suffix, encode in _encoders():
+            target = path.with_name(path.name + suffix)
+            if target.exists() and target.stat().st_mtime >= source_stat.st_mtime:
+                stats["up_to_date"] += 1
+                continue
+            data = data if data is not None else path.read_bytes()
+            body = encode(data)
+            if len(body) < len(data):
+                _atomic_write(target, body)
+                stats["compressed"] += 1
+    return stats
+
+
+def pick_variant(path: Path, request: Request):
+    """Returns (path, stat, content-encoding) of the best precompressed variant the client accepts."""
+    encodings = set(accepted_encodings(request))
+    for encoding, suffix in VARIANTS:
+        if encoding not in encodings:
+            continue
+        variant = path.with_name(path.name + suffix)
+        try:
+            return variant, os.stat(variant), encoding
+        except FileNotFoundError:
+            continue
+    return path, None, None
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves <file>.br / <file>.gz when the client accepts them,
+    with immutable caching for hashed file names.
+    """
+
+    def lookup_path(self, path: str):
+        full_path, stat_result = super().lookup_path(path)
+        # index-<hash>.js.br requested by name would be sent as a plain file with the wrong type
+        if stat_result is not None and is_precompressed_variant(Path(full_path)):
+            return "", None
+        return full_path, stat_result
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope,
+                      status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        path = Path(full_path)
+        # The media type comes from the original name, not from .br/.gz
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+        variant, variant_stat, encoding = pick_variant(path, Request(scope))
+        if encoding:
+            path, stat_result = variant, variant_stat
+
+        response = FileResponse(path, status_code=status_code, stat_result=stat_result, media_type=media_type)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE if HASHED_NAME.search(Path(full_path).name) else REVALIDATE_CACHE
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class IndexPage:
+    """
+    dist/index.html kept in memory as raw, gzip and brotli bodies with a content ETag.
+    The file is re-read only when its mtime or size changes (e.g. after a rebuild).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._key = None
+        self._bodies: Dict[Optional[str], bytes] = {}
+        self.etag = ""
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return self.path.is_file()
+
+    def _refresh(self):
+        st = self.path.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        if key == self._key:
+            return
+        with self._lock:
+            if key == self._key:
+                return
+            raw = self.path.read_bytes()
+            bodies = {None: raw, "gzip": gzip.compress(raw, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                bodies["br"] = brotli.compress(raw, quality=11)
+            self._bodies = bodies
+            self.etag = f'"{hashlib.sha256(raw).hexdigest()[:16]}"'
+            self._key = key
+
+    def response(self, request: Request) -> Response:
+        self._refresh()
+        headers = {"ETag": self.etag, "Cache-Control": REVALIDATE_CACHE, "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        encodings = set(accepted_encodings(request))
+        for encoding, _ in VARIANTS:
+            if encoding in encodings and encoding in self._bodies:
+                headers["Content-Encoding"] = encoding
+                return Response(self._bodies[encoding], media_type="text/html", headers=headers)
+        return Response(self._bodies[None], media_type="text/html", headers=headers)
+
+
+def dist_file(root: Path, relative: str) -> Optional[Path]:
+    """A file directly served from the build output (favicon, robots.txt), or None. Never a .br/.gz variant."""
+    if not relative:
+        return None
+    root = root.resolve()
+    candidate = (root / relative).resolve()
+    if (candidate.is_relative_to(root) and candidate.is_file() and candidate.name != "index.html"
+            and not is_precompressed_variant(candidate)):
+        return candidate
+    return None
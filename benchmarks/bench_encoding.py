@@ -0,0 +1,96 @@
+"""
+Response encoding benchmark.
+
+Compares the current response format (row records, stdlib json, uncompressed)
+with the columnar shape, orjson and gzip/brotli for a single-student
+/fetch/htno payload, an 8-semester /analyze/pdf payload and a 200-student batch.
+
+    python -m benchmarks.bench_encoding
+"""
+import gzip
+import io
+import json
+import logging
+import time
+from typing import Callable, Dict
+
+from backend import encoding
+from backend.data_processor import AcademicProcessor
+from backend.result_parser import parse_result_html
+from tools.fixtures import generate_student, render_memo_pdf, render_result_page
+
+
+def fetch_payload(htno: str) -> Dict:
+    return parse_result_html(render_result_page(generate_student(htno, semesters=8, supplementary=True)), htno)
+
+
+def analyze_payload(htno: str) -> Dict:
+    processor = AcademicProcessor()
+    processor.parse_pdf(io.BytesIO(render_memo_pdf(generate_student(htno, semesters=8))))
+    return {
+        "success": True,
+        "processed_count": 1,
+        "subjects": processor.subjects_df.to_dict(orient='records'),
+        "semesters": processor.semesters_df.to_dict(orient='records'),
+        "cgpa": processor.get_cgpa(),
+        "percentage": processor.get_percentage(),
+        "htno": htno,
+        "student_name": processor.get_student_info()['name'],
+    }
+
+
+def batch_payload(count: int = 200) -> Dict:
+    subjects = []
+    for i in range(count):
+        subjects.extend(fetch_payload(f"20B91A{i + 1:04d}")["subjects"])
+    return {"success": True, "subjects": subjects, "total_subjects": len(subjects)}
+
+
+def stdlib_dumps(payload) -> bytes:
+    # What FastAPI's default JSONResponse does today
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def columnar(payload: Dict) -> Dict:
+    return {k: encoding.to_columnar(v) if k in encoding.TABLE_KEYS and isinstance(v, list) else v
+            for k, v in payload.items()}
+
+
+def time_ms(fn: Callable, repeat: int = 50) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    logging.getLogger("backend.data_processor").setLevel(logging.WARNING)
+    payloads = {
+        "fetch (1 student)": fetch_payload("20B91A0501"),
+        "analyze (8 sems)": analyze_payload("20B91A0502"),
+        "batch (200)": batch_payload(),
+    }
+    serializers = {"json": stdlib_dumps}
+    if encoding.orjson is not None:
+        serializers["orjson"] = encoding.dumps
+
+    print(f"{'payload':<20}{'shape':<10}{'encoder':<8}{'bytes':>10}{'gzip':>9}{'br':>9}{'encode ms':>11}{'vs current':>12}")
+    for name, payload in payloads.items():
+        current = None
+        for shape, transform in (("records", lambda p: p), ("columnar", columnar)):
+            for enc_name, dumps in serializers.items():
+                body = dumps(transform(payload))
+                encode_ms = time_ms(lambda: dumps(transform(payload)), repeat=10 if "batch" in name else 50)
+                gz = len(gzip.compress(body, compresslevel=encoding.GZIP_LEVEL))
+                br = len(encoding.brotli.compress(body, quality=encoding.BROTLI_QUALITY)) if encoding.brotli else None
+                if current is None:
+                    current = len(body)
+                print(f"{name:<20}{shape:<10}{enc_name:<8}{len(body):>10}{gz:>9}{br if br else '-':>9}"
+                      f"{encode_ms:>11.3f}{len(body) / current:>11.0%}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Memory report for the subjects_df layout.
+
+Builds one subjects frame for a batch of synthetic students (8 semesters each,
+with supplementary attempts) in the plain layout pandas infers and in the
+compact layout AcademicProcessor uses, and prints bytes per subject row:
+
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --students 2000
+"""
+import argparse
+from typing import Dict, List
+
+import pandas as pd
+
+from backend.data_processor import AcademicProcessor, compact_subjects, memory_per_row
+from tools.fixtures import GRADE_POINTS, generate_student
+
+
+def batch_rows(students: int) -> List[Dict]:
+    rows = []
+    for n in range(students):
+        record = generate_student(f"20B91A{n:04d}", semesters=8, supplementary=n % 3 == 0, seed=n)
+        for sm in record['semesters']:
+            for s in sm['subjects']:
+                rows.append({'year': sm['year'], 'sem': sm['sem'], 'subject_code': s['code'],
+                             'subject_name': s['name'], 'grade': s['grade'], 'credits': float(s['credits']),
+                             'grade_points': GRADE_POINTS[s['grade']], 'htno': record['htno']})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare subjects_df memory in the plain and compact layouts")
+    parser.add_argument("--students", type=int, default=500)
+    args = parser.parse_args()
+
+    rows = batch_rows(args.students)
+    plain = pd.DataFrame(rows)
+    plain['credit_points'] = plain['credits'] * plain['grade_points']
+    compact = AcademicProcessor.from_subjects(rows).subjects_df
+
+    print(f"{args.students} students, {len(plain)} subject rows")
+    for label, df in (("plain", plain), ("compact", compact)):
+        print(f"{label:<8} {memory_per_row(df):>8.1f} bytes/row  {df.memory_usage(deep=True).sum() / 2**20:>8.2f} MB")
+        for col, nbytes in df.memory_usage(deep=True, index=False).items():
+            print(f"    {col:<14} {str(df[col].dtype):<10} {nbytes / len(df):>7.1f} bytes/row")
+    print(f"compact layout uses {memory_per_row(compact) / memory_per_row(plain):.0%} of the plain layout")
+
+    # compact_subjects is idempotent, so frames that are already compact are left alone
+    assert compact_subjects(compact)['grade'].dtype == compact['grade'].dtype
+
+
+if __name__ == "__main__":
+    main()
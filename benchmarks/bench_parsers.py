@@ -0,0 +1,232 @@
+"""
+Parser benchmark suite.
+
+Measures throughput and memory of both result parsers over a fixed synthetic
+corpus and checks every parsed document against its golden output:
+
+- html: backend.result_parser.parse_result_html (the /fetch/htno parser)
+- pdf:  AcademicProcessor.parse_pdf (the /analyze/pdf parser)
+
+    python -m benchmarks.bench_parsers --regenerate      # rebuild corpus + golden outputs
+    python -m benchmarks.bench_parsers --save-baseline   # run and store timings as the baseline
+    python -m benchmarks.bench_parsers                   # run, compare with baseline, exit 1 on regression
+
+Golden outputs come from the generated student records, not from the parsers,
+so they catch wrong output as well as changed output.
+"""
+import argparse
+import io
+import itertools
+import json
+import logging
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from backend.data_processor import AcademicProcessor
+from backend.result_parser import parse_result_html
+from tools.fixtures import GRADE_POINTS, generate_student, render_memo_pdf, render_result_page
+
+BENCH_DIR = Path(__file__).parent
+CORPUS_DIR = BENCH_DIR / "corpus"
+GOLDEN_DIR = BENCH_DIR / "golden"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+
+def corpus_cases() -> List[Dict]:
+    """Fixed matrix of page layouts, including 8-semester and supplementary cases."""
+    cases = []
+    for n, (semesters, supplementary, missing_headers, numeric_labels) in enumerate(
+            itertools.product([1, 2, 4, 6, 8], [False, True], [False, True], [False, True])):
+        regulation = 'R22' if n % 2 else 'R18'
+        htno = f"{'22' if regulation == 'R22' else '20'}B91A{n + 1:04d}"
+        cases.append({'htno': htno, 'semesters': semesters, 'supplementary': supplementary,
+                      'missing_headers': missing_headers, 'numeric_labels': numeric_labels,
+                      'regulation': regulation})
+    return cases
+
+
+def expected_subjects(record: Dict) -> List[List]:
+    return [[sm['year'], sm['sem'], s['code'], s['name'], s['grade'], s['credits'], GRADE_POINTS[s['grade']]]
+            for sm in record['semesters'] for s in sm['subjects']]
+
+
+def regenerate():
+    """Writes the corpus documents and their golden outputs."""
+    for kind in ("html", "pdf"):
+        (CORPUS_DIR / kind).mkdir(parents=True, exist_ok=True)
+        (GOLDEN_DIR / kind).mkdir(parents=True, exist_ok=True)
+
+    for case in corpus_cases():
+        record = generate_student(case['htno'], semesters=case['semesters'],
+                                  supplementary=case['supplementary'], regulation=case['regulation'])
+        stem = f"{case['htno']}_{case['semesters']}sem"
+        html_stem = stem + ("_noheader" if case['missing_headers'] else "") + ("_numeric" if case['numeric_labels'] else "")
+        (CORPUS_DIR / "html" / f"{html_stem}.html").write_text(
+            render_result_page(record, case['missing_headers'], case['numeric_labels']))
+        golden = {
+            'htno': record['htno'],
+            'student_name': record['name'],
+            'subjects': expected_subjects(record),
+            'sgpa': {f"{sm['year']}-{sm['sem']}": sm['sgpa'] for sm in record['semesters']},
+        }
+        (GOLDEN_DIR / "html" / f"{html_stem}.json").write_text(json.dumps(golden, indent=1))
+
+        # Header and label variants only matter for HTML, so PDFs use one layout per record
+        if not case['missing_headers'] and not case['numeric_labels']:
+            (CORPUS_DIR / "pdf" / f"{stem}.pdf").write_bytes(render_memo_pdf(record))
+            (GOLDEN_DIR / "pdf" / f"{stem}.json").write_text(json.dumps(golden, indent=1))
+
+    print(f"Corpus written to {CORPUS_DIR}")
+
+
+def parse_html_doc(data: bytes) -> Dict:
+    # htno is only copied onto each subject row, so it does not affect what is checked
+    result = parse_result_html(data.decode("utf-8"), "")
+    return {
+        'student_name': result['student_name'],
+        'subjects': [[s['year'], s['sem'], s['subject_code'], s['subject_name'], s['grade'], s['credits'],
+                      s['grade_points']] for s in result['subjects']],
+        'sgpa': {f"{s['year']}-{s['sem']}": s.get('official_sem_sgpa') for s in result['subjects']},
+    }
+
+
+def parse_pdf_doc(data: bytes) -> Dict:
+    processor = AcademicProcessor()
+    if not processor.parse_pdf(io.BytesIO(data)):
+        return {'htno': None, 'subjects': [], 'sgpa': {}}
+    df = processor.subjects_df
+    return {
+        'htno': processor.get_student_info()['htno'],
+        'student_name': processor.get_student_info()['name'],
+        'subjects': [[int(r.year), int(r.sem), r.subject_code, r.subject_name, r.grade, float(r.credits),
+                      int(r.grade_points)] for r in df.itertuples()],
+        'sgpa': {f"{int(r.year)}-{int(r.sem)}": float(r.sgpa) for r in processor.semesters_df.itertuples()},
+    }
+
+
+PARSERS: Dict[str, Tuple[str, Callable[[bytes], Dict]]] = {
+    'html': ('.html', parse_html_doc),
+    'pdf': ('.pdf', parse_pdf_doc),
+}
+
+
+def load_corpus(kind: str) -> List[Tuple[str, bytes, Dict]]:
+    suffix = PARSERS[kind][0]
+    docs = []
+    for path in sorted((CORPUS_DIR / kind).glob(f"*{suffix}")):
+        golden = json.loads((GOLDEN_DIR / kind / f"{path.stem}.json").read_text())
+        docs.append((path.stem, path.read_bytes(), golden))
+    if not docs:
+        raise SystemExit(f"No {kind} corpus found, run with --regenerate first")
+    return docs
+
+
+def check_golden(kind: str, parsed: Dict, golden: Dict) -> List[str]:
+    problems = []
+    if parsed['subjects'] != golden['subjects']:
+        problems.append(f"subjects differ ({len(parsed['subjects'])} parsed, {len(golden['subjects'])} expected)")
+    if parsed['sgpa'] != golden['sgpa']:
+        problems.append(f"sgpa differs: {parsed['sgpa']} != {golden['sgpa']}")
+    if parsed.get('student_name') != golden['student_name']:
+        problems.append(f"name differs: {parsed.get('student_name')!r}")
+    if kind == 'pdf' and parsed['htno'] != golden['htno']:
+        problems.append(f"htno differs: {parsed['htno']!r}")
+    return problems
+
+
+def bench_kind(kind: str, repeat: int) -> Dict:
+    parse = PARSERS[kind][1]
+    docs = load_corpus(kind)
+
+    mismatches = {}
+    for name, data, golden in docs:
+        problems = check_golden(kind, parse(data), golden)
+        if problems:
+            mismatches[name] = problems
+
+    # Best of N passes over the whole corpus; the minimum is the least noisy estimate
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, data, _ in docs:
+            parse(data)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+
+    peaks = []
+    for _, data, _ in docs:
+        tracemalloc.start()
+        parse(data)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        'documents': len(docs),
+        'docs_per_sec': round(len(docs) / best, 2),
+        'ms_per_doc': round(best * 1000 / len(docs), 3),
+        'peak_kb_mean': round(sum(peaks) / len(peaks) / 1024, 1),
+        'peak_kb_max': round(max(peaks) / 1024, 1),
+        'golden_mismatches': mismatches,
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for kind, r in results.items():
+        base = baseline.get(kind)
+        if not base:
+            continue
+        for metric in ('ms_per_doc', 'peak_kb_max'):
+            limit = base[metric] * (1 + tolerance)
+            if r[metric] > limit:
+                regressions.append(f"{kind}.{metric}: {r[metric]} > {base[metric]} (+{tolerance:.0%} allowed)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HTML and PDF result parsers")
+    parser.add_argument("--regenerate", action="store_true", help="Rebuild the corpus and golden outputs")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", choices=sorted(PARSERS), help="Benchmark a single parser")
+    args = parser.parse_args()
+
+    # parse_pdf logs every document at INFO level
+    logging.getLogger("backend.data_processor").setLevel(logging.WARNING)
+
+    if args.regenerate:
+        regenerate()
+
+    kinds = [args.only] if args.only else sorted(PARSERS)
+    results = {kind: bench_kind(kind, args.repeat) for kind in kinds}
+
+    failed = False
+    for kind, r in results.items():
+        print(f"{kind:<5} {r['documents']:>3} docs  {r['docs_per_sec']:>9} docs/s  {r['ms_per_doc']:>8} ms/doc  "
+              f"peak {r['peak_kb_mean']} KB mean / {r['peak_kb_max']} KB max")
+        for name, problems in r['golden_mismatches'].items():
+            failed = True
+            print(f"  MISMATCH {name}: {'; '.join(problems)}")
+
+    if args.save_baseline:
+        if failed:
+            raise SystemExit("Refusing to save a baseline while golden outputs mismatch")
+        args.baseline.write_text(json.dumps({k: {m: v for m, v in r.items() if m != 'golden_mismatches'}
+                                             for k, r in results.items()}, indent=2))
+        print(f"Baseline saved to {args.baseline}")
+    elif args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"  REGRESSION {line}")
+        failed = failed or bool(regressions)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+PDF text backend comparison.
+
+Runs AcademicProcessor.parse_pdf over the memo corpus once per text extraction
+backend (no fallback) and once with the configured fallback chain, and reports
+speed, memory and how many documents still match their golden output:
+
+    python -m benchmarks.bench_pdf_text
+    python -m benchmarks.bench_pdf_text --region 0,0,1,0.9 --repeat 10
+
+The corpus is shared with bench_parsers (run it with --regenerate to rebuild).
+"""
+import argparse
+import io
+import logging
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from backend.data_processor import AcademicProcessor
+from backend.pdf_text import EXTRACTORS, Region, configured_backends, parse_region
+from benchmarks.bench_parsers import check_golden, load_corpus
+
+
+def parse_doc(data: bytes, backends: List[str], region: Optional[Region]) -> Dict:
+    processor = AcademicProcessor()
+    if not processor.parse_pdf(io.BytesIO(data), backends=backends, region=region):
+        return {'htno': None, 'subjects': [], 'sgpa': {}, 'backend': processor.text_backend}
+    df = processor.subjects_df
+    return {
+        'htno': processor.get_student_info()['htno'],
+        'student_name': processor.get_student_info()['name'],
+        'subjects': [[int(r.year), int(r.sem), r.subject_code, r.subject_name, r.grade, float(r.credits),
+                      int(r.grade_points)] for r in df.itertuples()],
+        'sgpa': {f"{int(r.year)}-{int(r.sem)}": float(r.sgpa) for r in processor.semesters_df.itertuples()},
+        'backend': processor.text_backend,
+    }
+
+
+def bench_backends(backends: List[str], region: Optional[Region], repeat: int) -> Dict:
+    docs = load_corpus("pdf")
+
+    matches, used = 0, {}
+    for _, data, golden in docs:
+        parsed = parse_doc(data, backends, region)
+        used[parsed['backend']] = used.get(parsed['backend'], 0) + 1
+        if not check_golden("pdf", parsed, golden):
+            matches += 1
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, data, _ in docs:
+            parse_doc(data, backends, region)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+
+    peaks = []
+    for _, data, _ in docs:
+        tracemalloc.start()
+        parse_doc(data, backends, region)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        'documents': len(docs),
+        'golden_matches': matches,
+        'ms_per_doc': round(best * 1000 / len(docs), 3),
+        'peak_kb_max': round(max(peaks) / 1024, 1),
+        'used': used,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PDF text extraction backends on the memo corpus")
+    parser.add_argument("--region", help="Crop box 'x0,top,x1,bottom' as page fractions")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.getLogger("backend.data_processor").setLevel(logging.WARNING)
+    region = parse_region(args.region)
+
+    # pdfplumber runs first as the reference the others are compared with
+    runs = {name: [name] for name in sorted(EXTRACTORS, key=lambda n: n != "pdfplumber")}
+    runs["chain: " + ",".join(configured_backends())] = configured_backends()
+
+    baseline = None
+    for label, backends in runs.items():
+        r = bench_backends(backends, region, args.repeat)
+        if label == "pdfplumber":
+            baseline = r['ms_per_doc']
+        speedup = f"  {baseline / r['ms_per_doc']:.1f}x vs pdfplumber" if baseline else ""
+        used = ", ".join(f"{k}={v}" for k, v in r['used'].items())
+        print(f"{label:<32} {r['ms_per_doc']:>8} ms/doc  peak {r['peak_kb_max']:>8} KB  "
+              f"golden {r['golden_matches']}/{r['documents']}  ({used}){speedup}")
+
+
+if __name__ == "__main__":
+    main()
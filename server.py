@@ -1,8 +1,9 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.routing import APIRoute
 from pydantic import BaseModel
+from starlette.routing import Match
 from typing import List, Optional
 from pathlib import Path
 import io
@@ -12,8 +13,24 @@ import shutil
 import time
 import os
 import re
+import uuid
 from backend.data_processor import AcademicProcessor
 from backend.analyzer import AcademicAnalyzer
+from backend.result_parser import ResultNotFoundError, ResultPageError, parse_result_html
+from backend.result_delta import DELTA_TABLE_KEYS, build_delta_response, result_version
+from backend.snapshot_archive import get_archive
+from backend.resilience import CircuitBreaker, Deadline, DeadlineExceededError
+from backend.encoding import encode_response
+from backend.coordination import BROWSER_LIMIT, get_coordinator
+from backend.adaptive_limit import ADAPTIVE_LIMIT, AdaptiveLimiter
+from backend.results_store import get_results_store, parse_semester
+from backend.profiling import RequestProfiler
+from backend.export import (
+    EXPORT_FORMATS, EXPORT_TABLES, iter_batches, normalize_students, parquet_available, stream_csv, stream_parquet,
+)
+from backend.static_assets import (
+    REVALIDATE_CACHE, STATIC_PRECOMPRESS, IndexPage, PrecompressedStaticFiles, dist_file, precompress_directory,
+)
 
 app = FastAPI(title="JNTUH Academic Insights API")
 
@@ -26,10 +43,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Serve static files from dist folder (built React app)
+# Opt-in request profiling (see backend/profiling.py for PROFILE_* settings)
+profiler = RequestProfiler()
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """
+    Profile a request when it carries the admin token or is randomly sampled. The profile
+    runs until the last body chunk is sent, so streamed exports are covered too.
+    """
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    # Request ids end up in file names, so keep only safe characters and no leading dot
+    request_id = re.sub(r"[^A-Za-z0-9_.-]", "", request_id)[:64].lstrip(".") or uuid.uuid4().hex
+
+    trigger = profiler.should_profile(request.headers) if profiler.enabled else None
+    if not trigger:
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+    session = profiler.start(request_id)
+    meta = {"method": request.method, "path": request.url.path, "trigger": trigger, "status_code": 500}
+
+    def finish_profile():
+        try:
+            profiler.finish(session, meta)
+        except Exception as e:
+            print(f"Failed to write profile: {e}")
+
+    try:
+        response = await call_next(request)
+    except BaseException:
+        finish_profile()
+        raise
+    meta["status_code"] = response.status_code
+
+    # call_next returns before the body is produced; a streamed body (e.g. /export/cohort)
+    # does its work while being sent, so the profile ends after the last chunk
+    body = response.body_iterator
+
+    async def profiled_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            finish_profile()
+
+    response.body_iterator = profiled_body()
+    response.headers["X-Request-ID"] = request_id
+    response.headers["X-Profile-Id"] = session["profile_id"]
+    return response
+
+# Serve static files from dist folder (built React app), precompressed and cache-friendly
 DIST_PATH = Path(__file__).parent / "dist"
+index_page = IndexPage(DIST_PATH / "index.html")
 if DIST_PATH.exists():
-    app.mount("/assets", StaticFiles(directory=DIST_PATH / "assets"), name="assets")
+    if STATIC_PRECOMPRESS:
+        try:
+            precompress_directory(DIST_PATH)
+        except OSError as e:
+            print(f"Could not precompress {DIST_PATH}, serving uncompressed assets: {e}")
+    app.mount("/assets", PrecompressedStaticFiles(directory=DIST_PATH / "assets"), name="assets")
 
 # Models
 class Subject(BaseModel):
@@ -47,328 +121,268 @@ class AnalysisRequest(BaseModel):
 
 class HallTicketRequest(BaseModel):
     htno: str
+    # Version (ETag) of the result the client already holds; only changes since then are returned
+    since_version: Optional[str] = None
+
+# Upstream results site. Override to point /fetch/htno at a stand-in (see tools/results_standin.py)
+RESULTS_URL_TEMPLATE = os.environ.get(
+    "RESULTS_URL_TEMPLATE", "https://jntuhresults.vercel.app/academicresult/result?htno={htno}"
+)
+# Extra wait after networkidle for the React page to render its tables
+RESULTS_RENDER_WAIT_MS = int(os.environ.get("RESULTS_RENDER_WAIT_MS", "5000"))
+
+# Raw page archive for offline re-parsing (None when SNAPSHOT_DIR is empty)
+snapshot_archive = get_archive()
+
+# Total time budget for one /fetch/htno call: queueing + browser launch + page load + render
+SCRAPE_DEADLINE_MS = int(os.environ.get("SCRAPE_DEADLINE_MS", "45000"))
+
+# Browser slots and result cache shared by all workers on this host (see backend/coordination.py)
+coordinator = get_coordinator()
+# Browser limit tuned at runtime from scrape latency, errors and free memory (see backend/adaptive_limit.py)
+if ADAPTIVE_LIMIT:
+    browser_limiter = AdaptiveLimiter(coordinator.get_limit, coordinator.compare_and_set_limit)
+else:
+    browser_limiter = None
+    coordinator.set_limit(BROWSER_LIMIT)
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", "600"))
+
+# Indexed store of every parsed result, for cohort queries (None when RESULTS_DB_PATH is empty)
+results_store = get_results_store()
+
+def store_result(htno: str, subjects: List[dict], name: str, source: str, official_cgpa: Optional[float] = None):
+    """
+    Upserts a parsed result; storage problems never fail the request that produced it.
+    Blocks on SQLite, so async handlers call it through asyncio.to_thread.
+    """
+    if not results_store or not htno:
+        return
+    try:
+        results_store.upsert_result(htno, subjects, name=name or "", source=source, official_cgpa=official_cgpa)
+    except Exception as e:
+        print(f"Results store failed for {htno}: {e}")
+
+# Stops sending scrapes to the results site after repeated failures
+upstream_breaker = CircuitBreaker(
+    "jntuhresults",
+    failure_threshold=int(os.environ.get("BREAKER_FAILURE_THRESHOLD", "5")),
+    recovery_timeout=float(os.environ.get("BREAKER_RECOVERY_SECONDS", "30")),
+)
+
+async def result_response(http_request: Request, result: dict, since_version: Optional[str] = None, fresh: bool = False):
+    """
+    Serves a /fetch/htno result tagged with its content version.
+
+    With `since_version` the body is a delta against that earlier version (new semesters,
+    changed grades, new SGPAs), or just `unchanged: true`. An unknown version gets the full result.
+    """
+    htno = result.get("htno", "")
+    version = result_version(result)
+    headers = {"ETag": f'"{version}"'}
+    if fresh and results_store:
+        try:
+            # SQLite read/write, kept off the event loop
+            await asyncio.to_thread(results_store.save_version, htno, version, result)
+        except Exception as e:
+            print(f"Results store failed to save version for {htno}: {e}")
+
+    since_version = (since_version or "").strip().strip('"')
+    if since_version:
+        base = None
+        if since_version != version and results_store:
+            try:
+                base = await asyncio.to_thread(results_store.get_version, htno, since_version)
+            except Exception as e:
+                print(f"Results store failed to load version for {htno}: {e}")
+        if since_version == version or base is not None:
+            delta = build_delta_response(base or result, result, since_version, version)
+            if result.get("stale"):
+                delta.update(stale=True, fetched_at=result.get("fetched_at"))
+            return encode_response(http_request, delta, table_keys=DELTA_TABLE_KEYS, headers=headers)
+
+    return encode_response(http_request, {**result, "version": version}, headers=headers)
+
+def archive_snapshot(htno: str, html: str):
+    """Gzips and saves a fetched page (pruning old ones); blocking, so run it in a thread."""
+    if not snapshot_archive:
+        return
+    try:
+        snapshot_archive.save(htno, html)
+    except Exception as e:
+        print(f"Snapshot archive failed: {e}")
+
+def load_stale_result(htno: str) -> Optional[dict]:
+    """
+    Re-parses the newest archived page for a hall ticket that still parses, used while the
+    upstream site is down. Error or half-rendered pages archived since then are skipped.
+    Reads and parses files, so async callers run it in a thread.
+    """
+    if not snapshot_archive:
+        return None
+    try:
+        paths = snapshot_archive.snapshots(htno)
+    except Exception:
+        return None
+    for path in reversed(paths):
+        try:
+            result = parse_result_html(snapshot_archive.read(path), htno)
+        except Exception:
+            continue
+        result["stale"] = True
+        result["fetched_at"] = snapshot_archive.fetched_at(path).isoformat()
+        return result
+    return None
+
+async def stale_or_unavailable(http_request: Request, htno: str, since_version: Optional[str], status_code: int, detail: str):
+    """Serves the last archived result while the results site is failing, otherwise raises `status_code`."""
+    stale = await asyncio.to_thread(load_stale_result, htno)
+    if stale:
+        return await result_response(http_request, stale, since_version)
+    raise HTTPException(status_code=status_code, detail=detail)
+
+@app.get("/status/upstream")
+def upstream_status():
+    """Circuit breaker state and trip counts for the results site"""
+    return upstream_breaker.snapshot()
+
+@app.get("/status/browsers")
+def browser_status():
+    """Host-wide browser slot usage and adaptive limit history"""
+    return {
+        **coordinator.snapshot(),
+        "adaptive": browser_limiter.snapshot() if browser_limiter else {"enabled": False},
+    }
 
 @app.get("/")
-def read_root():
+def read_root(request: Request):
     """Serve React app or API message"""
-    index_file = DIST_PATH / "index.html"
-    if index_file.exists():
-        return HTMLResponse(content=index_file.read_text(), status_code=200)
+    if index_page.exists():
+        return index_page.response(request)
     return {"message": "JNTUH Academic Insights API is running"}
 @app.post("/fetch/htno")
-async def fetch_by_hall_ticket(request: HallTicketRequest):
+async def fetch_by_hall_ticket(request: HallTicketRequest, http_request: Request):
     """
     Fetches academic results using Playwright browser automation.
-    Includes concurrency limiting (max 3 browsers) to support 500+ req/day safely.
+    Browser concurrency is limited host-wide (BROWSER_LIMIT across all workers) to support 500+ req/day safely.
     """
     import concurrent.futures
-    from playwright.sync_api import sync_playwright
-    from bs4 import BeautifulSoup
+    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
     import asyncio
     
-    # Global semaphore to limit concurrent browser instances
-    # 3 concurrent browsers = ~9 requests/min = ~540 requests/hour
-    # This easily handles the 500/day requirement without crashing the server RAM.
-    if not hasattr(app.state, 'browser_semaphore'):
-        app.state.browser_semaphore = asyncio.Semaphore(3)
-
     htno = request.htno.strip().upper().replace(" ", "")
     
     if len(htno) < 10:
         raise HTTPException(status_code=400, detail="Invalid hall ticket number format. Must be 10 characters.")
     
-    def scrape_with_browser(hall_ticket: str):
-        """Use Playwright to render JavaScript and get the full HTML"""
+    def scrape_with_browser(hall_ticket: str, deadline: Deadline):
+        """Use Playwright to render JavaScript; returns (HTTP status, full HTML)"""
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
+            browser = p.chromium.launch(headless=True, timeout=deadline.remaining_ms())
             page = browser.new_page()
             
             try:
-                # Navigate to the results page
-                url = f"https://jntuhresults.vercel.app/academicresult/result?htno={hall_ticket}"
-                page.goto(url, timeout=60000)
+                # Every stage gets what is left of the request budget rather than its own fixed timeout
+                url = RESULTS_URL_TEMPLATE.format(htno=hall_ticket)
+                response = page.goto(url, timeout=deadline.remaining_ms(cap_ms=60000))
+                # goto does not raise on 5xx, so the status is checked by the caller
+                status = response.status if response else None
                 
                 # Wait for the page to fully load
-                page.wait_for_load_state("networkidle", timeout=30000)
+                page.wait_for_load_state("networkidle", timeout=deadline.remaining_ms(cap_ms=30000))
                 
                 # Wait additional time for React to render
-                page.wait_for_timeout(5000)
+                page.wait_for_timeout(deadline.remaining_ms(cap_ms=RESULTS_RENDER_WAIT_MS))
                 
                 # Get the rendered HTML
                 html_content = page.content()
                 
                 browser.close()
-                return html_content
+                return status, html_content
                 
             except Exception as e:
                 browser.close()
                 raise e
     
+    # Results fetched recently by any worker are served without a browser
+    cached = await asyncio.to_thread(coordinator.cache_get, f"result:{htno}")
+    if cached:
+        return await result_response(http_request, cached, request.since_version)
+    
+    # Fail fast while the upstream site is known to be down
+    if not upstream_breaker.allow_request():
+        return await stale_or_unavailable(http_request, htno, request.since_version, 503,
+                                          "Results site is temporarily unavailable. Please try again in a minute or use PDF upload.")
+    
+    deadline = Deadline(SCRAPE_DEADLINE_MS / 1000)
+    # Set once the call's outcome is reported to the breaker; otherwise its probe slot is released below
+    breaker_settled = False
     try:
-        # Acquire semaphore to limit concurrency
-        async with app.state.browser_semaphore:
-            # Run Playwright in thread pool (it's sync)
-            loop = asyncio.get_event_loop()
-            try:
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    html_content = await loop.run_in_executor(executor, scrape_with_browser, htno)
-            except Exception as e:
-                print(f"Playwright failed: {e}")
-                raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
-        
-        # Parse with BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Check for error in page
-        page_text = soup.get_text().lower()
-        if "not found" in page_text or "invalid" in page_text:
-            raise HTTPException(status_code=404, detail="Hall ticket number not found.")
-        
-        # Find all tables
-        tables = soup.find_all('table')
-        
-        if len(tables) < 2:
-            raise HTTPException(status_code=404, detail="No result tables found. Please verify the hall ticket number or try PDF upload.")
-        
-        # First table is student info
-        student_name = ""
-        student_table = tables[0]
-        for cell in student_table.find_all(['td', 'th']):
-            text = cell.get_text(strip=True)
-            # Name is usually all uppercase letters, 5+ chars
-            if len(text) > 5 and text.isupper() and text.replace(" ", "").isalpha():
-                student_name = text
-                break
-        
-        # Parse semester tables (tables 1+)
-        subjects = []
-        current_year = 1
-        current_sem = 1
-        
-        for table in tables[1:]:
-            rows = table.find_all('tr')
-            if not rows: continue
-
-            # Dynamic Column Mapping
-            header_map = {}
-            header_row = rows[0]
-            header_cells = header_row.find_all(['td', 'th'])
-            
-            # If first row looks like data (no headers), assume standard R18 format
-            # Standard: Code, Name, Internal, External, Total, Grade, Credits
-            if len(header_cells) > 0 and header_cells[0].get_text(strip=True).upper() != "SUBJECT CODE":
-                 header_map = {0: 'code', 1: 'name', 2: 'internal', 3: 'external', 4: 'total', 5: 'grade', 6: 'credits'}
-                 start_row_idx = 0
-            else:
-                # Map headers to indices
-                for idx, cell in enumerate(header_cells):
-                    txt = cell.get_text(strip=True).upper()
-                    if "CODE" in txt: header_map[idx] = 'code'
-                    elif "NAME" in txt: header_map[idx] = 'name'
-                    elif "INT" in txt: header_map[idx] = 'internal'
-                    elif "EXT" in txt: header_map[idx] = 'external'
-                    elif "TOT" in txt: header_map[idx] = 'total'
-                    elif "GRADE" in txt and "POINT" not in txt: header_map[idx] = 'grade' # Avoid Grade Points
-                    elif "CREDIT" in txt or txt == "C" or txt == "CR" or "CRD" in txt: header_map[idx] = 'credits'
-                start_row_idx = 1
-
-            for row in rows[start_row_idx:]:
-                # Get all cells (td or th)
-                cells = row.find_all(['td', 'th'])
-                
-                # Parse semester headers dynamically
-                # Search for the header immediately preceding the table
-                # Headers are usually in <b>, <h4>, <h5>, or <p> tags
-                # Example text: "IV Year I Semester" or "1-1"
-                
-                header_text = ""
-                prev_element = table.find_previous(['b', 'h4', 'h5', 'p', 'center'])
-                if prev_element:
-                    header_text = prev_element.get_text(strip=True)
-                
-                # Try to parse year/sem from header
-                parsed_sem = None
-                
-                # Regex for "IV Year I Semester" or "IV YEAR I SEMESTER"
-                roman_map = {'I': 1, 'II': 2, 'III': 3, 'IV': 4}
-                roman_match = re.search(r"(I{1,4}|IV)\s*Year\s*(I{1,2})\s*Semester", header_text, re.IGNORECASE)
-                if roman_match:
-                    y_str, s_str = roman_match.groups()
-                    parsed_sem = (roman_map.get(y_str.upper(), 0), roman_map.get(s_str.upper(), 0))
-                
-                # Regex for "1-1", "1-2" etc
-                if not parsed_sem:
-                    num_match = re.search(r"(\d)\s*-\s*(\d)", header_text)
-                    if num_match:
-                        parsed_sem = (int(num_match.group(1)), int(num_match.group(2)))
-                
-                if parsed_sem:
-                    current_year, current_sem = parsed_sem
-                else:
-                    # Fallback to sequential logic if parsing fails (but log/warn internally if needed)
-                    # We only increment if we didn't find a header, to maintain legacy behavior for weird pages
-                    pass
-
-                # Check for SGPA row (marks end of semester)
-                if cells:
-                    first_text = cells[0].get_text(strip=True)
-                    if "SGPA" in first_text:
-                        # Extract SGPA value (e.g. "SGPA : 8.69")
-                        try:
-                            # Try to find a float in the text
-                            sgpa_match = re.search(r"(\d+\.\d+)", first_text)
-                            if not sgpa_match and len(cells) > 1:
-                                sgpa_match = re.search(r"(\d+\.\d+)", cells[1].get_text(strip=True))
-                            
-                            if sgpa_match:
-                                official_sgpa = float(sgpa_match.group(1))
-                                
-                                # Attach this SGPA to all subjects of the CURRENT detected semester
-                                # Since we parse the header BEFORE the table, current_year/sem are correct for THIS table.
-                                for s in reversed(subjects):
-                                    if s['year'] == min(current_year, 4) and s['sem'] == current_sem:
-                                        s['official_sem_sgpa'] = official_sgpa
-                                    else:
-                                        # Stop if we hit a subject from a different semester (optimization)
-                                        break 
-                        except:
-                            pass
-
-                        # For sequential fallback logic: Move to next semester ONLY if we rely on it
-                        # But with dynamic parsing, we don't strictly need to increment.
-                        # However, for tables WITHOUT headers, we might still need it.
-                        if not parsed_sem:
-                            if current_sem == 1:
-                                current_sem = 2
-                            else:
-                                current_year += 1
-                                current_sem = 1
-                        continue
-                
-                # Parse subject row using map
-                code = name = grade = ""
-                internal = external = total = None
-                credits = None
-                
-                # If map failed (empty), fallback to index based
-                if not header_map and len(cells) >= 7:
-                     header_map = {0: 'code', 1: 'name', 2: 'internal', 3: 'external', 4: 'total', 5: 'grade', 6: 'credits'}
-
-                for idx, cell in enumerate(cells):
-                    if idx not in header_map: continue
-                    val = cell.get_text(strip=True)
-                    field = header_map[idx]
-                    
-                    if field == 'code': code = val
-                    elif field == 'name': name = val
-                    elif field == 'grade': grade = val
-                    elif field == 'internal': 
-                        try: internal = int(val) 
-                        except: pass
-                    elif field == 'external':
-                        try: external = int(val)
-                        except: pass
-                    elif field == 'total':
-                        try: total = int(val)
-                        except: pass
-                    elif field == 'credits':
-                        try: 
-                            c = float(val)
-                            if 0 <= c <= 10: credits = c
-                        except: pass
-
-                # Safety net: If credits still None, try scanning typical columns (6 or 7) for float values
-                if credits is None and len(cells) >= 7:
-                    # Look for a small float in any column after index 5
-                    for i in range(5, len(cells)):
-                        try:
-                            val = cells[i].get_text(strip=True)
-                            c = float(val)
-                            # Credits are usually {0, 1, 1.5, 2, 3, 4}
-                            if c in [0.0, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0]:
-                                credits = c
-                                break
-                        except: pass
-
-                # Smart credit fallback based on subject type
-                if credits is None:  
-                    name_lower = name.lower() if name else ""
-                    code_lower = code.lower() if code else ""
-                    
-                    # Labs typically have 1-1.5 credits
-                    if "lab" in name_lower or code_lower.endswith("l"):
-                        credits = 1.5
-                    # Workshops and skill courses
-                    elif "workshop" in name_lower or "skill" in name_lower:
-                        credits = 1.0
-                    # Projects
-                    elif "project" in name_lower or "seminar" in name_lower:
-                        credits = 2.0
-                    # Theory subjects with tutorials (usually 4 credits)
-                    elif "mathematics" in name_lower or "calculus" in name_lower or "statistics" in name_lower:
-                        credits = 4.0
-                    # Regular theory subjects (default 3 credits)
-                    else:
-                        credits = 3.0
-
-                # Fallback for Grade if not mapped (sometimes header says 'Gr')
-                if not grade:
-                    for cell in cells:
-                        val = cell.get_text(strip=True)
-                        if val in ['O', 'A+', 'A', 'B+', 'B', 'C', 'F', 'Ab']:
-                             grade = val; break
-                             
-                # Valid subject check
-                if code and name and grade and len(code) < 15:
-
-                    
-                    if code and code != "Subject Code":
-                        subject_data = {
-                            "subject_code": code,
-                            "subject_name": name,
-                            "grade": grade,
-                            "credits": credits if credits is not None else 3.0,
-                            "grade_points": get_grade_points(grade),
-                            "year": min(current_year, 4),
-                            "sem": current_sem,
-                            "htno": htno
-                        }
-                        # Add marks if available
-                        if internal is not None:
-                            subject_data["internal"] = internal
-                        if external is not None:
-                            subject_data["external"] = external
-                        if total is not None:
-                            subject_data["total"] = total
-                        
-                        subjects.append(subject_data)
-        
-        if not subjects:
-            raise HTTPException(status_code=404, detail="Could not extract subject data. Please try PDF upload instead.")
+        # Wait for a host-wide browser slot, but only for as long as the budget allows
+        try:
+            async with coordinator.browser_slot(timeout=deadline.remaining()) as queued:
+                # Run Playwright in thread pool (it's sync)
+                loop = asyncio.get_event_loop()
+                scrape_started = time.perf_counter()
+                scrape_ok = False
+                try:
+                    with concurrent.futures.ThreadPoolExecutor() as executor:
+                        status, html_content = await loop.run_in_executor(executor, scrape_with_browser, htno, deadline)
+                    scrape_ok = True
+                except (DeadlineExceededError, PlaywrightTimeoutError) as e:
+                    # Stages run with what is left of the deadline, so Playwright's own timeout is the budget running out
+                    upstream_breaker.record_failure()
+                    breaker_settled = True
+                    raise HTTPException(status_code=504, detail=f"Results site did not respond in time: {str(e)}")
+                except Exception as e:
+                    upstream_breaker.record_failure()
+                    breaker_settled = True
+                    print(f"Playwright failed: {e}")
+                    raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
+                finally:
+                    if browser_limiter:
+                        # Reads and writes the shared limit every ADAPTIVE_WINDOW scrapes
+                        await asyncio.to_thread(browser_limiter.record, time.perf_counter() - scrape_started, scrape_ok, queued)
+        except (asyncio.TimeoutError, DeadlineExceededError):
+            raise HTTPException(status_code=503, detail="Server is busy fetching other results. Please try again shortly.")
+        
+        # An error page from the site counts against the breaker just like a failed load
+        if status is not None and status >= 500:
+            upstream_breaker.record_failure()
+            breaker_settled = True
+            return await stale_or_unavailable(http_request, htno, request.since_version, 502,
+                                              f"Results site returned an error (HTTP {status}). Please try again shortly or use PDF upload.")
+        
+        # Archive the raw (2xx) page before parsing so parser bugs can be fixed offline later
+        await asyncio.to_thread(archive_snapshot, htno, html_content)
         
-        # Try to find overall CGPA in page text
-        official_cgpa = None
         try:
-            # Look for "CGPA : 7.69" pattern
-            cgpa_match = re.search(r"CGPA\s*[:\-]?\s*(\d+\.\d+)", page_text, re.IGNORECASE)
-            if cgpa_match:
-                official_cgpa = float(cgpa_match.group(1))
-        except:
-            pass
-
-        return {
-            "success": True,
-            "htno": htno,
-            "student_name": student_name,
-            "subjects": subjects,
-            "total_subjects": len(subjects),
-            "official_cgpa": official_cgpa
-        }
+            result = parse_result_html(html_content, htno)
+        except ResultPageError as e:
+            upstream_breaker.record_failure()
+            breaker_settled = True
+            return await stale_or_unavailable(http_request, htno, request.since_version, 502, str(e))
+        except ResultNotFoundError:
+            # The site answered properly; the hall ticket just has no result
+            upstream_breaker.record_success()
+            breaker_settled = True
+            raise
+        upstream_breaker.record_success()
+        breaker_settled = True
+        await asyncio.to_thread(coordinator.cache_set, f"result:{htno}", result, RESULT_CACHE_TTL)
+        await asyncio.to_thread(store_result, htno, result["subjects"], result["student_name"], "fetch", result["official_cgpa"])
+        return await result_response(http_request, result, request.since_version, fresh=True)
+    
+    except ResultNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}. Please try PDF upload instead.")
+    finally:
+        # Covers a busy queue, a failing slot lookup, a parser crash and client cancellation
+        if not breaker_settled:
+            upstream_breaker.release()
 
 
 
@@ -386,17 +400,8 @@ def parse_exam_code(exam_code: str) -> dict:
     return {"year": 1, "sem": 1}
 
 
-def get_grade_points(grade: str) -> int:
-    """Convert grade to grade points."""
-    grade_map = {
-        "O": 10, "A+": 9, "A": 8, "B+": 7, "B": 6, "C": 5, "D": 4,
-        "F": 0, "Ab": 0, "-": 0
-    }
-    return grade_map.get(grade, 0)
-
-
 @app.post("/analyze/pdf")
-async def analyze_pdf(files: List[UploadFile] = File(...)):
+async def analyze_pdf(request: Request, files: List[UploadFile] = File(...)):
     """
     Accepts multiple PDF files, parses them, and returns:
     - subjects: List of all extracted subjects
@@ -427,7 +432,14 @@ async def analyze_pdf(files: List[UploadFile] = File(...)):
         htno = student_info.get('htno') or (subjects[0]['htno'] if subjects and 'htno' in subjects[0] else None)
         student_name = student_info.get('name')
         
-        return {
+        # Each uploaded memo carries its own hall ticket, so store per student
+        if 'htno' in processor.subjects_df:
+            for pdf_htno, group in processor.subjects_df.groupby('htno', observed=True):
+                # student_info belongs to the last parsed memo; other students keep their stored name
+                name = student_name if pdf_htno == student_info.get('htno') else ""
+                await asyncio.to_thread(store_result, pdf_htno, group.to_dict(orient='records'), name, "pdf")
+        
+        return encode_response(request, {
             "success": True,
             "processed_count": processed_count,
             "subjects": subjects,
@@ -436,7 +448,7 @@ async def analyze_pdf(files: List[UploadFile] = File(...)):
             "percentage": processor.get_percentage(),
             "htno": htno,
             "student_name": student_name
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -462,6 +474,70 @@ async def predict_next_sgpa(data: List[dict]):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Upper bound on scenario grid size per request (targets x semesters x credit loads)
+TARGET_GRID_MAX_CASES = int(os.environ.get("TARGET_GRID_MAX_CASES", "200000"))
+
+class TargetScenarioRequest(BaseModel):
+    target_cgpas: List[float]
+    remaining_semesters: List[int] = [1]
+    credits_per_sem: List[float] = [21]
+    # Either the current standing, or the subject rows it is computed from
+    current_cgpa: Optional[float] = None
+    total_completed_credits: Optional[float] = None
+    subjects: Optional[List[dict]] = None
+    feasible_only: bool = False
+    # Also list grade changes in completed subjects that reach each target (needs subjects)
+    grade_changes: bool = False
+
+# Plain def: the grid and its encoding are CPU work, so they run in the threadpool
+@app.post("/predict/target-cgpa")
+def predict_target_cgpa(request: TargetScenarioRequest, http_request: Request):
+    """
+    Required SGPA for a grid of what-if scenarios in one call:
+    every target CGPA x remaining semesters x credits per semester.
+    """
+    cases = len(request.target_cgpas) * len(request.remaining_semesters) * len(request.credits_per_sem)
+    if cases == 0:
+        raise HTTPException(status_code=400, detail="target_cgpas, remaining_semesters and credits_per_sem must not be empty")
+    if cases > TARGET_GRID_MAX_CASES:
+        raise HTTPException(status_code=400, detail=f"Scenario grid has {cases} cases, the limit is {TARGET_GRID_MAX_CASES}")
+    if min(request.remaining_semesters) < 1 or min(request.credits_per_sem) <= 0:
+        raise HTTPException(status_code=400, detail="remaining_semesters must be >= 1 and credits_per_sem > 0")
+    if request.grade_changes and not request.subjects:
+        raise HTTPException(status_code=400, detail="grade_changes needs the subjects list")
+
+    try:
+        if request.subjects:
+            # Same SGPA/CGPA formula as the rest of the API
+            processor = AcademicProcessor.from_subjects(request.subjects)
+            completed_credits = float(processor.subjects_df['credits'].sum())
+            current_cgpa = (float(processor.subjects_df['credit_points'].sum()) / completed_credits
+                            if completed_credits else 0.0)
+            analyzer = AcademicAnalyzer(processor.semesters_df, processor.subjects_df)
+        elif request.current_cgpa is not None and request.total_completed_credits is not None:
+            current_cgpa, completed_credits = request.current_cgpa, request.total_completed_credits
+            analyzer = AcademicAnalyzer(pd.DataFrame())
+        else:
+            raise HTTPException(status_code=400, detail="Send subjects, or current_cgpa and total_completed_credits")
+
+        result = analyzer.target_cgpa_grid(current_cgpa, completed_credits, request.target_cgpas,
+                                           request.remaining_semesters, request.credits_per_sem,
+                                           feasible_only=request.feasible_only)
+        payload = {
+            "success": True,
+            "current_cgpa": round(current_cgpa, 2),
+            "total_completed_credits": completed_credits,
+            **result,
+        }
+        if request.grade_changes:
+            payload["grade_changes"] = analyzer.grade_change_options(request.target_cgpas)
+        return encode_response(http_request, payload, table_keys=("cases", "by_target", "grade_changes"))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/analyze/advanced")
 async def analyze_advanced(request_data: dict):
     """
@@ -492,6 +568,123 @@ async def analyze_advanced(request_data: dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ════════════════════════════════════════════════════════════════════════════════
+# STORED RESULTS QUERY API
+# ════════════════════════════════════════════════════════════════════════════════
+
+def require_results_store():
+    if not results_store:
+        raise HTTPException(status_code=503, detail="Results store is disabled (RESULTS_DB_PATH is empty)")
+    return results_store
+
+# Plain def: the SQLite queries run in Starlette's threadpool, not on the event loop
+@app.get("/results/students")
+def query_students(
+    htno_prefix: Optional[str] = None,
+    batch: Optional[str] = None,
+    college: Optional[str] = None,
+    branch: Optional[str] = None,
+    backlog_subject: Optional[str] = None,
+    has_backlog: Optional[bool] = None,
+    limit: int = 1000
+):
+    """
+    Students from stored results, filtered by cohort and backlogs.
+    Example: all 2020 batch students of college B9 with a backlog in CS501PC:
+    /results/students?batch=20&college=B9&backlog_subject=CS501PC
+    """
+    store = require_results_store()
+    students = store.find_students(htno_prefix=htno_prefix, batch=batch, college_code=college, branch_code=branch,
+                                   backlog_subject=backlog_subject, has_backlog=has_backlog, limit=min(limit, 10000))
+    return {"count": len(students), "students": students}
+
+@app.get("/results/students/{htno}")
+def get_stored_student(htno: str):
+    """Stored semesters and subjects of one student"""
+    student = require_results_store().get_student(htno)
+    if not student:
+        raise HTTPException(status_code=404, detail="No stored result for this hall ticket")
+    return student
+
+@app.get("/results/sgpa-distribution")
+def sgpa_distribution(
+    semester: str,
+    htno_prefix: Optional[str] = None,
+    batch: Optional[str] = None,
+    college: Optional[str] = None,
+    branch: Optional[str] = None
+):
+    """SGPA histogram for one semester, e.g. /results/sgpa-distribution?semester=3-1&batch=20"""
+    store = require_results_store()
+    try:
+        year, sem = parse_semester(semester)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return store.sgpa_distribution(year, sem, htno_prefix=htno_prefix, batch=batch,
+                                   college_code=college, branch_code=branch)
+
+
+# ════════════════════════════════════════════════════════════════════════════════
+# COHORT EXPORT API
+# ════════════════════════════════════════════════════════════════════════════════
+
+# Largest cohort one export selects from the results store by filters
+EXPORT_MAX_STUDENTS = int(os.environ.get("EXPORT_MAX_STUDENTS", "100000"))
+
+class CohortExportRequest(BaseModel):
+    # Inline subject data: [{"htno", "name", "subjects": [...]}, ...]
+    students: Optional[List[dict]] = None
+    # Or students from the results store, by hall ticket list or cohort filters
+    htnos: Optional[List[str]] = None
+    htno_prefix: Optional[str] = None
+    batch: Optional[str] = None
+    college: Optional[str] = None
+    branch: Optional[str] = None
+    table: str = "transcripts"
+    format: str = "csv"
+
+@app.post("/export/cohort")
+def export_cohort(request: CohortExportRequest):
+    """
+    Streams transcripts (one row per subject) or SGPA tables (one row per semester) for a
+    whole cohort as CSV or Parquet, one batch of students at a time.
+    """
+    if request.format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {sorted(EXPORT_FORMATS)}")
+    if request.table not in EXPORT_TABLES:
+        raise HTTPException(status_code=400, detail=f"table must be one of {sorted(EXPORT_TABLES)}")
+    if request.format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export needs the pyarrow package")
+
+    if request.students is not None:
+        # Checked up front: once streaming starts, an error can only truncate the file
+        try:
+            students = iter(normalize_students(request.students))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        store = require_results_store()
+        if request.htnos:
+            htnos = request.htnos
+        elif any((request.htno_prefix, request.batch, request.college, request.branch)):
+            htnos = [s["htno"] for s in store.find_students(
+                htno_prefix=request.htno_prefix, batch=request.batch, college_code=request.college,
+                branch_code=request.branch, limit=EXPORT_MAX_STUDENTS)]
+        else:
+            raise HTTPException(status_code=400, detail="Send students, htnos or a cohort filter")
+        # Loaded one at a time while the response streams; unknown hall tickets are skipped
+        students = (s for s in (store.get_student(h) for h in htnos) if s)
+
+    batches = iter_batches(students, request.table)
+    if request.format == "parquet":
+        body = stream_parquet(batches, request.table)
+    else:
+        body = stream_csv(batches, request.table)
+    filename = f"cohort-{request.table}.{request.format}"
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[request.format],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
 # ════════════════════════════════════════════════════════════════════════════════
 # NOTES DOWNLOAD API
 # ════════════════════════════════════════════════════════════════════════════════
@@ -659,6 +852,39 @@ async def upload_note(
         print(f"Error uploading note: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# ════════════════════════════════════════════════════════════════════════════════
+# FRONTEND ROUTES
+# ════════════════════════════════════════════════════════════════════════════════
+
+# First path segments owned by the API; unknown paths under them stay 404s
+API_PREFIXES = {"fetch", "analyze", "predict", "notes", "results", "export", "status", "assets"}
+
+class FrontendRoute(APIRoute):
+    """
+    Catch-all GET route that does not match other methods at all, so POST /unknown stays
+    a 404 instead of the 405 a path-only match would give.
+    """
+
+    def matches(self, scope):
+        if scope["type"] == "http" and scope["method"] not in self.methods:
+            return Match.NONE, {}
+        return super().matches(scope)
+
+def serve_frontend(full_path: str, request: Request):
+    """Top-level build files (favicon etc.), and index.html for client-side routes"""
+    if full_path.split("/", 1)[0] in API_PREFIXES or not index_page.exists():
+        raise HTTPException(status_code=404, detail="Not Found")
+    static_file = dist_file(DIST_PATH, full_path)
+    if static_file:
+        return FileResponse(static_file, headers={"Cache-Control": REVALIDATE_CACHE})
+    if "." in full_path.rsplit("/", 1)[-1]:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return index_page.response(request)
+
+# Registered last so every API route above takes precedence
+app.router.add_api_route("/{full_path:path}", serve_frontend, methods=["GET", "HEAD"], include_in_schema=False,
+                         route_class_override=FrontendRoute)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,24 @@
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(scope="session")
+def client(tmp_path_factory):
+    """TestClient for server.app with coordination, snapshots and results stored in a temp folder."""
+    from fastapi.testclient import TestClient
+
+    root = tmp_path_factory.mktemp("server")
+    os.environ.update({
+        "COORD_SQLITE_PATH": str(root / "coordination.sqlite3"),
+        "SNAPSHOT_DIR": str(root / "snapshots"),
+        "RESULTS_DB_PATH": str(root / "results.sqlite3"),
+        "STATIC_PRECOMPRESS": "0",
+    })
+    server = importlib.import_module("server")
+    return TestClient(server.app)
@@ -0,0 +1,21 @@
+import pandas as pd
+
+from backend.analyzer import AcademicAnalyzer
+
+
+def subjects(grades):
+    points = {"O": 10, "A+": 9, "A": 8, "B": 6}
+    return pd.DataFrame([{"year": 1, "sem": 1, "subject_code": f"S{i}", "subject_name": f"SUBJECT {i}",
+                          "grade": g, "credits": 3.0, "grade_points": points[g]} for i, g in enumerate(grades)])
+
+
+def test_dominant_grade_tie_breaks_lexically():
+    # O and A tie; plain string columns have always reported "A"
+    df = subjects(["O", "A", "O", "A", "B"])
+    stats = AcademicAnalyzer(pd.DataFrame(), df).analyze_performance()
+    assert stats["dominant_grade"] == "A"
+
+
+def test_dominant_grade_without_tie():
+    stats = AcademicAnalyzer(pd.DataFrame(), subjects(["A+", "O", "A+"])).analyze_performance()
+    assert stats["dominant_grade"] == "A+"
@@ -0,0 +1,53 @@
+import pytest
+
+from backend.export import batch_frame, normalize_students
+
+
+def subject(**overrides):
+    row = {"year": 1, "sem": 1, "subject_code": "151AA", "subject_name": "MATHEMATICS-I",
+           "grade": "A", "credits": 4, "grade_points": 8}
+    row.update(overrides)
+    return row
+
+
+def test_missing_grade_points_is_derived_from_grade():
+    row = subject(grade="B+")
+    del row["grade_points"]
+    students = normalize_students([{"htno": "20B91A0501", "name": "X", "subjects": [row, subject()]}])
+
+    assert students[0]["subjects"][0]["grade_points"] == 7
+    frame = batch_frame(students, "sgpa")
+    assert frame["sgpa"].tolist() == [7.5]
+
+
+@pytest.mark.parametrize("field", ["year", "sem", "credits"])
+def test_missing_required_field_is_rejected(field):
+    row = subject()
+    del row[field]
+    with pytest.raises(ValueError, match=field):
+        normalize_students([{"htno": "20B91A0501", "subjects": [row]}])
+
+
+def test_unknown_grade_without_grade_points_is_rejected():
+    row = subject(grade="Z")
+    del row["grade_points"]
+    with pytest.raises(ValueError, match="grade"):
+        normalize_students([{"htno": "20B91A0501", "subjects": [row]}])
+
+
+def test_export_returns_400_before_streaming(client):
+    row = subject()
+    del row["credits"]
+    response = client.post("/export/cohort", json={"students": [{"htno": "20B91A0501", "subjects": [row]}]})
+    assert response.status_code == 400
+    assert "credits" in response.json()["detail"]
+
+
+def test_export_without_grade_points_streams_complete_csv(client):
+    row = subject()
+    del row["grade_points"]
+    response = client.post("/export/cohort", json={"students": [{"htno": "20B91A0501", "name": "X", "subjects": [row]}]})
+    assert response.status_code == 200
+    lines = response.text.strip().splitlines()
+    assert len(lines) == 2
+    assert lines[1].startswith("20B91A0501,X,1,1,151AA")
@@ -0,0 +1,14 @@
+import pandas as pd
+
+from backend.analyzer import AcademicAnalyzer
+from backend.encoding import from_columnar, to_columnar, to_rows
+
+
+def test_grid_cases_are_columns_in_both_encodings():
+    grid = AcademicAnalyzer(pd.DataFrame()).target_cgpa_grid(7.4, 120, [7, 8], [1, 2], [20])
+
+    rows = to_rows(grid["cases"])
+    assert rows[2] == {"target_cgpa": 8.0, "remaining_semesters": 1, "credits_per_sem": 20.0,
+                       "required_sgpa": 11.6, "feasible": False}
+    assert from_columnar(to_columnar(grid["cases"])) == rows
+    assert grid["feasible_count"] == 3
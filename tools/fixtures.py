@@ -0,0 +1,233 @@
+"""
+Synthetic JNTUH result fixtures.
+
+Generates deterministic student records and renders them either as a
+jntuhresults-style HTML page (what /fetch/htno scrapes) or as a grade memo
+PDF (what /analyze/pdf parses). Used by the stand-in results site, the load
+test harness and the parser benchmarks.
+"""
+import random
+import zlib
+from typing import Dict, List, Optional
+
+ROMAN = {1: 'I', 2: 'II', 3: 'III', 4: 'IV'}
+
+SEMESTERS = [(1, 1), (1, 2), (2, 1), (2, 2), (3, 1), (3, 2), (4, 1), (4, 2)]
+
+GRADE_POINTS = {'O': 10, 'A+': 9, 'A': 8, 'B+': 7, 'B': 6, 'C': 5, 'F': 0, 'Ab': 0}
+
+# (name, credits) pools per subject kind
+THEORY_SUBJECTS = [
+    ("MATRICES AND CALCULUS", 4.0), ("ENGINEERING CHEMISTRY", 4.0), ("PROGRAMMING FOR PROBLEM SOLVING", 4.0),
+    ("BASIC ELECTRICAL ENGINEERING", 3.0), ("DATA STRUCTURES", 3.0), ("COMPUTER ORGANIZATION AND ARCHITECTURE", 3.0),
+    ("DISCRETE MATHEMATICS", 3.0), ("OPERATING SYSTEMS", 3.0), ("DATABASE MANAGEMENT SYSTEMS", 3.0),
+    ("SOFTWARE ENGINEERING", 3.0), ("COMPUTER NETWORKS", 3.0), ("DESIGN AND ANALYSIS OF ALGORITHMS", 3.0),
+    ("COMPILER DESIGN", 3.0), ("MACHINE LEARNING", 3.0), ("CLOUD COMPUTING", 3.0), ("CRYPTOGRAPHY AND NETWORK SECURITY", 3.0),
+    ("ARTIFICIAL INTELLIGENCE", 3.0), ("BIG DATA ANALYTICS", 3.0), ("DATA MINING", 2.0), ("INTERNET OF THINGS", 3.0),
+]
+LAB_SUBJECTS = [
+    ("DATA STRUCTURES LAB", 1.5), ("OPERATING SYSTEMS LAB", 1.0), ("DATABASE MANAGEMENT SYSTEMS LAB", 1.0),
+    ("ENGINEERING WORKSHOP", 1.0), ("COMPUTER NETWORKS LAB", 1.5), ("MACHINE LEARNING LAB", 1.0),
+]
+MANDATORY_SUBJECTS = [("ENVIRONMENTAL SCIENCE", 0.0), ("CONSTITUTION OF INDIA", 0.0), ("GENDER SENSITIZATION LAB", 0.0)]
+
+FIRST_NAMES = ["RAVI", "SAI", "PRIYA", "ANUSHA", "KIRAN", "SRINIVAS", "LAKSHMI", "HARSHA", "DIVYA", "VAMSHI"]
+LAST_NAMES = ["KUMAR", "REDDY", "RAO", "SHARMA", "GOUD", "NAIDU", "VARMA", "CHARY"]
+
+
+def grade_from_total(total: int, external: int, external_max: int) -> str:
+    # JNTUH requires 35% in the external exam and 40% overall to pass
+    if external < external_max * 0.35 or total < 40:
+        return 'F'
+    if total >= 90: return 'O'
+    if total >= 80: return 'A+'
+    if total >= 70: return 'A'
+    if total >= 60: return 'B+'
+    if total >= 50: return 'B'
+    return 'C'
+
+
+def sgpa_for(subjects: List[Dict]) -> float:
+    """SGPA over the latest attempt of each subject, matching AcademicProcessor's formula."""
+    latest = {}
+    for s in subjects:
+        latest[s['code']] = s
+    credits = sum(s['credits'] for s in latest.values())
+    if credits == 0:
+        return 0.0
+    points = sum(s['credits'] * GRADE_POINTS[s['grade']] for s in latest.values())
+    return round(points / credits, 2)
+
+
+def scenario_for(htno: str) -> Dict:
+    """
+    Derives a page scenario from the hall ticket so the same htno always renders the same page.
+
+    - htno ending in 0000: not found page
+    - regulation from the admission year digits (22+ is R22, otherwise R18)
+    - number of semesters, supplementary attempts and missing column headers vary by checksum
+    """
+    htno = htno.upper()
+    seed = zlib.crc32(htno.encode())
+    year_digits = htno[:2]
+    return {
+        'not_found': htno.endswith('0000'),
+        'regulation': 'R22' if year_digits.isdigit() and int(year_digits) >= 22 else 'R18',
+        'semesters': 1 + seed % 8,
+        'supplementary': seed % 3 == 0,
+        'missing_headers': seed % 5 == 0,
+        'numeric_labels': seed % 7 == 0,
+        'seed': seed,
+    }
+
+
+def generate_student(htno: str, semesters: Optional[int] = None, supplementary: Optional[bool] = None,
+                     regulation: Optional[str] = None, seed: Optional[int] = None) -> Dict:
+    """Builds a deterministic student record with subject-level marks for each semester."""
+    scenario = scenario_for(htno)
+    rng = random.Random(scenario['seed'] if seed is None else seed)
+    semesters = scenario['semesters'] if semesters is None else semesters
+    supplementary = scenario['supplementary'] if supplementary is None else supplementary
+    regulation = regulation or scenario['regulation']
+    internal_max, external_max = (40, 60) if regulation == 'R22' else (25, 75)
+    ability = rng.uniform(0.45, 0.95)
+
+    record = {
+        'htno': htno.upper(),
+        'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        'regulation': regulation,
+        'semesters': [],
+    }
+
+    for year, sem in SEMESTERS[:semesters]:
+        pool = rng.sample(THEORY_SUBJECTS, 5) + rng.sample(LAB_SUBJECTS, 2) + [rng.choice(MANDATORY_SUBJECTS)]
+        subjects = []
+        for idx, (name, credits) in enumerate(pool):
+            kind = 'PC' if idx < 5 else 'LAB' if idx < 7 else 'MC'
+            code = f"{'CS' if kind != 'MC' else 'MC'}{year}{sem}{idx}{'L' if kind == 'LAB' else 'PC'}"
+            internal = min(internal_max, int(rng.gauss(ability, 0.15) * internal_max))
+            external = min(external_max, max(0, int(rng.gauss(ability, 0.2) * external_max)))
+            internal = max(0, internal)
+            total = internal + external
+            grade = grade_from_total(total, external, external_max)
+            if rng.random() < 0.02:
+                grade, external, total = 'Ab', 0, internal
+            subjects.append({'code': code, 'name': name, 'internal': internal, 'external': external,
+                             'total': total, 'grade': grade, 'credits': credits if grade not in ('F', 'Ab') else 0.0})
+
+            # Supplementary attempt for failed subjects is listed right after the regular attempt
+            if supplementary and grade in ('F', 'Ab'):
+                sup_external = int(external_max * rng.uniform(0.4, 0.7))
+                sup_total = internal + sup_external
+                sup_grade = grade_from_total(sup_total, sup_external, external_max)
+                subjects.append({'code': code, 'name': name, 'internal': internal, 'external': sup_external,
+                                 'total': sup_total, 'grade': sup_grade,
+                                 'credits': credits if sup_grade != 'F' else 0.0})
+
+        record['semesters'].append({'year': year, 'sem': sem, 'subjects': subjects, 'sgpa': sgpa_for(subjects)})
+
+    return record
+
+
+def semester_label(year: int, sem: int, numeric: bool = False) -> str:
+    if numeric:
+        return f"{year}-{sem} Semester Results"
+    return f"{ROMAN[year]} Year {ROMAN[sem]} Semester"
+
+
+def render_result_page(record: Dict, missing_headers: bool = False, numeric_labels: bool = False) -> str:
+    """Renders a student record the way the rendered jntuhresults page looks after JavaScript runs."""
+    parts = [
+        "<html><head><title>JNTUH Results</title></head><body>",
+        "<table class='student-info'>",
+        f"<tr><td>Hall Ticket</td><td>{record['htno']}</td></tr>",
+        f"<tr><td>Name</td><td>{record['name']}</td></tr>",
+        "<tr><td>College Code</td><td>91</td></tr>",
+        "</table>",
+    ]
+    total_points = total_credits = 0.0
+    for semester in record['semesters']:
+        parts.append(f"<b>{semester_label(semester['year'], semester['sem'], numeric_labels)}</b>")
+        parts.append("<table class='semester'>")
+        if not missing_headers:
+            parts.append("<tr><th>SUBJECT CODE</th><th>SUBJECT NAME</th><th>INTERNAL</th><th>EXTERNAL</th>"
+                         "<th>TOTAL</th><th>GRADE</th><th>CREDITS</th></tr>")
+        for s in semester['subjects']:
+            parts.append(
+                f"<tr><td>{s['code']}</td><td>{s['name']}</td><td>{s['internal']}</td><td>{s['external']}</td>"
+                f"<td>{s['total']}</td><td>{s['grade']}</td><td>{s['credits']}</td></tr>"
+            )
+            total_points += s['credits'] * GRADE_POINTS[s['grade']]
+            total_credits += s['credits']
+        parts.append(f"<tr><td colspan='7'>SGPA : {semester['sgpa']:.2f}</td></tr>")
+        parts.append("</table>")
+    if total_credits:
+        parts.append(f"<p>CGPA : {total_points / total_credits:.2f}</p>")
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def render_not_found_page(htno: str) -> str:
+    return ("<html><head><title>JNTUH Results</title></head><body>"
+            f"<h3>Result not found for {htno.upper()}</h3></body></html>")
+
+
+def memo_lines(record: Dict) -> List[str]:
+    """Text lines of a consolidated grade memo, in the layout AcademicProcessor expects."""
+    lines = [
+        "JAWAHARLAL NEHRU TECHNOLOGICAL UNIVERSITY HYDERABAD",
+        f"Hall Ticket No: {record['htno']}",
+        f"Name: {record['name']}",
+        f"(Grade Memo {record['regulation']})",
+    ]
+    for semester in record['semesters']:
+        lines.append(semester_label(semester['year'], semester['sem']))
+        lines.append("SUBJECT CODE SUBJECT NAME GRADE CREDITS")
+        for s in semester['subjects']:
+            credits = f"{s['credits']:g}"
+            lines.append(f"{s['code']} {s['name']} {s['grade']} {credits}")
+        lines.append(f"SGPA {semester['sgpa']:.2f}")
+    return lines
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_memo_pdf(record: Dict, lines_per_page: int = 48) -> bytes:
+    """
+    Writes a minimal text-only PDF of the grade memo.
+
+    Uses the built-in Helvetica font so no PDF library is needed to create fixtures.
+    """
+    lines = memo_lines(record)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects: List[bytes] = []
+    # 1: catalog, 2: pages, 3: font, then (page, content) pairs
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for pid, page_lines in zip(page_ids, pages):
+        stream = ["BT", "/F1 9 Tf", "40 800 Td", "14 TL"]
+        for line in page_lines:
+            stream.append(f"({_pdf_escape(line)}) Tj T*")
+        stream.append("ET")
+        content = "\n".join(stream).encode("latin-1")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {pid + 1} 0 R >>".encode())
+        objects.append(b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
@@ -0,0 +1,160 @@
+"""
+Open-loop load generator for the API.
+
+Sends requests at a fixed target rate (independent of response times, so a slow
+server shows up as growing latency rather than a silently lower request rate)
+and reports throughput, latency percentiles and error rates per endpoint.
+
+    python -m tools.load_test --base-url http://127.0.0.1:8000 --rate 5 --duration 60 \\
+        --mix fetch=1,pdf=2,catalog=5,download=2
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from tools.fixtures import generate_student, render_memo_pdf
+
+ENDPOINTS = ("fetch", "pdf", "catalog", "download")
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}', expected one of {ENDPOINTS}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def random_htno(rng: random.Random) -> str:
+    """Hall tickets in the stand-in's format; roughly 1 in 20 is a not-found ticket."""
+    year = rng.choice(["19", "20", "21", "22", "23"])
+    suffix = "0000" if rng.random() < 0.05 else f"{rng.randint(1, 9999):04d}"
+    return f"{year}B91A{suffix}"
+
+
+class LoadTest:
+    def __init__(self, base_url: str, rate: float, duration: float, mix: Dict[str, float],
+                 pdf_pool: int = 20, timeout: float = 120.0, seed: Optional[int] = None):
+        self.base_url = base_url.rstrip("/")
+        self.rate = rate
+        self.duration = duration
+        self.mix = mix
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.note_paths: List[str] = []
+        self.pdfs = [render_memo_pdf(generate_student(random_htno(self.rng))) for _ in range(pdf_pool)]
+
+    async def _load_note_paths(self, client: httpx.AsyncClient):
+        resp = await client.get(f"{self.base_url}/notes/catalog")
+        resp.raise_for_status()
+        for regulation in resp.json().get("regulations", []):
+            for f in regulation.get("files", []):
+                self.note_paths.append(f["path"])
+            for year in regulation.get("years", []):
+                for sem in year["semesters"]:
+                    for subject in sem["subjects"]:
+                        self.note_paths.extend(f["path"] for f in subject["files"])
+
+    async def _request(self, client: httpx.AsyncClient, endpoint: str):
+        start = time.perf_counter()
+        try:
+            if endpoint == "fetch":
+                resp = await client.post(f"{self.base_url}/fetch/htno", json={"htno": random_htno(self.rng)})
+            elif endpoint == "pdf":
+                pdf = self.rng.choice(self.pdfs)
+                resp = await client.post(f"{self.base_url}/analyze/pdf",
+                                         files=[("files", ("memo.pdf", pdf, "application/pdf"))])
+            elif endpoint == "catalog":
+                resp = await client.get(f"{self.base_url}/notes/catalog")
+            else:
+                resp = await client.get(f"{self.base_url}/notes/download",
+                                        params={"path": self.rng.choice(self.note_paths)})
+            # A 404 for an unknown hall ticket is an expected answer, not a failure
+            if resp.status_code >= 500 or (resp.status_code >= 400 and endpoint != "fetch"):
+                self.errors[endpoint][str(resp.status_code)] += 1
+        except httpx.HTTPError as e:
+            self.errors[endpoint][type(e).__name__] += 1
+        self.latencies[endpoint].append((time.perf_counter() - start) * 1000)
+
+    async def run(self) -> Dict:
+        names = list(self.mix)
+        weights = [self.mix[n] for n in names]
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            if "download" in self.mix:
+                await self._load_note_paths(client)
+                if not self.note_paths:
+                    raise RuntimeError("Notes catalog is empty, remove 'download' from the mix")
+
+            tasks = []
+            started = time.perf_counter()
+            sent = 0
+            while True:
+                elapsed = time.perf_counter() - started
+                if elapsed >= self.duration:
+                    break
+                # Catch up to the schedule so the offered rate stays constant
+                while sent < int(elapsed * self.rate) + 1:
+                    endpoint = self.rng.choices(names, weights)[0]
+                    tasks.append(asyncio.create_task(self._request(client, endpoint)))
+                    sent += 1
+                await asyncio.sleep(min(0.01, 1.0 / self.rate))
+            await asyncio.gather(*tasks)
+            wall = time.perf_counter() - started
+
+        return self.report(wall)
+
+    def report(self, wall: float) -> Dict:
+        results = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            arr = np.array(samples)
+            error_count = sum(self.errors[endpoint].values())
+            results[endpoint] = {
+                "requests": len(samples),
+                "throughput_rps": round(len(samples) / wall, 2),
+                "p50_ms": round(float(np.percentile(arr, 50)), 1),
+                "p95_ms": round(float(np.percentile(arr, 95)), 1),
+                "p99_ms": round(float(np.percentile(arr, 99)), 1),
+                "error_rate": round(error_count / len(samples), 4),
+                "errors": dict(self.errors[endpoint]),
+            }
+        return results
+
+
+def print_report(results: Dict):
+    print(f"{'endpoint':<10}{'reqs':>7}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    for endpoint, r in results.items():
+        print(f"{endpoint:<10}{r['requests']:>7}{r['throughput_rps']:>8}{r['p50_ms']:>10}"
+              f"{r['p95_ms']:>10}{r['p99_ms']:>10}{r['error_rate']:>9.2%}")
+        if r["errors"]:
+            print(f"{'':<10}{r['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the API at a target request rate")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--rate", type=float, default=5.0, help="Requests per second across all endpoints")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to send requests for")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("fetch=1,pdf=2,catalog=5,download=2"),
+                        help="Endpoint weights, e.g. fetch=1,pdf=2,catalog=5,download=2")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    test = LoadTest(args.base_url, args.rate, args.duration, args.mix, timeout=args.timeout, seed=args.seed)
+    print_report(asyncio.run(test.run()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Builds .br and .gz variants of the built frontend so the server never compresses
+static files per request. The server also does this at startup when the variants
+are missing or older than their source (STATIC_PRECOMPRESS=1).
+
+    npm run build && python -m tools.precompress_dist dist
+"""
+import argparse
+import time
+from pathlib import Path
+
+from backend.static_assets import STATIC_COMPRESS_MIN_BYTES, precompress_directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompress the built frontend with brotli and gzip")
+    parser.add_argument("dist", nargs="?", default="dist", type=Path, help="Vite build output folder")
+    parser.add_argument("--min-bytes", type=int, default=STATIC_COMPRESS_MIN_BYTES)
+    args = parser.parse_args()
+
+    if not args.dist.is_dir():
+        raise SystemExit(f"{args.dist} does not exist, run npm run build first")
+    started = time.perf_counter()
+    stats = precompress_directory(args.dist, args.min_bytes)
+    print(f"{stats['compressed']} variants written, {stats['up_to_date']} up to date "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
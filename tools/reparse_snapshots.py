@@ -0,0 +1,78 @@
+"""
+Re-runs the current HTML result parser over the snapshot archive.
+
+No network access is needed: every archived page is decompressed and parsed
+in a process pool, and the parsed /fetch/htno payloads are written to
+<output>/<HTNO>.json. Use it after a parser fix to rebuild results for every
+student that was already served.
+
+    python -m tools.reparse_snapshots --archive snapshots --output reparsed --workers 8
+    python -m tools.reparse_snapshots --keep 3     # also trim the archive to 3 pages per student
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Tuple
+
+from backend.result_parser import ResultNotFoundError, parse_result_html
+from backend.snapshot_archive import SNAPSHOT_DIR, SnapshotArchive
+
+
+def reparse_one(job: Tuple[str, str, str]) -> Dict:
+    htno, snapshot_path, out_path = job
+    try:
+        html = SnapshotArchive.read(Path(snapshot_path))
+        result = parse_result_html(html, htno)
+    except ResultNotFoundError as e:
+        return {"htno": htno, "status": "not_found", "detail": str(e)}
+    except Exception as e:
+        return {"htno": htno, "status": "error", "detail": f"{type(e).__name__}: {e}"}
+
+    result["fetched_at"] = SnapshotArchive.fetched_at(Path(snapshot_path)).isoformat()
+    Path(out_path).write_text(json.dumps(result))
+    return {"htno": htno, "status": "ok", "subjects": result["total_subjects"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-parse archived result pages offline")
+    parser.add_argument("--archive", default=SNAPSHOT_DIR or "snapshots", help="Snapshot archive folder")
+    parser.add_argument("--output", default="reparsed", help="Folder for parsed JSON results")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--all-versions", action="store_true",
+                        help="Parse every snapshot instead of only the newest per hall ticket")
+    parser.add_argument("--keep", type=int, default=0,
+                        help="First delete all but the newest N snapshots per hall ticket (0 keeps everything)")
+    args = parser.parse_args()
+
+    archive = SnapshotArchive(args.archive)
+    if args.keep > 0:
+        print(f"Pruned {archive.prune(keep=args.keep)} old snapshots")
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+
+    jobs = []
+    for htno, path in archive.iter_snapshots(not args.all_versions):
+        # Keep one file per snapshot when replaying history, one per student otherwise
+        name = f"{htno}_{path.name.split('.')[0]}.json" if args.all_versions else f"{htno}.json"
+        jobs.append((htno, str(path), str(output / name)))
+    if not jobs:
+        raise SystemExit(f"No snapshots found in {archive.root}")
+
+    start = time.perf_counter()
+    counts = {"ok": 0, "not_found": 0, "error": 0}
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for outcome in pool.map(reparse_one, jobs, chunksize=16):
+            counts[outcome["status"]] += 1
+            if outcome["status"] == "error":
+                print(f"{outcome['htno']}: {outcome['detail']}")
+    elapsed = time.perf_counter() - start
+
+    print(f"Re-parsed {len(jobs)} snapshots in {elapsed:.1f}s ({len(jobs) / elapsed:.1f}/s): "
+          f"{counts['ok']} ok, {counts['not_found']} not found, {counts['error']} errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Local stand-in for the jntuhresults site.
+
+Serves synthetic result pages so /fetch/htno can be exercised and load tested
+without touching the real site. Point the API at it with:
+
+    python -m tools.results_standin --port 8100 --latency-ms 800 --jitter-ms 400
+    RESULTS_URL_TEMPLATE="http://127.0.0.1:8100/academicresult/result?htno={htno}" uvicorn server:app
+
+The page for a hall ticket is deterministic (see tools.fixtures.scenario_for):
+hall tickets ending in 0000 return a not-found page.
+"""
+import argparse
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from tools.fixtures import generate_student, render_not_found_page, render_result_page, scenario_for
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    latency_ms = 0.0
+    jitter_ms = 0.0
+    error_rate = 0.0
+    quiet = False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/healthz":
+            return self._send(200, "ok", "text/plain")
+        if url.path != "/academicresult/result":
+            return self._send(404, "<html><body>Page not found</body></html>")
+
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+        if self.error_rate and random.random() < self.error_rate:
+            return self._send(503, "<html><body>Service Unavailable</body></html>")
+
+        htno = parse_qs(url.query).get("htno", [""])[0].strip().upper()
+        scenario = scenario_for(htno)
+        if not htno or scenario['not_found']:
+            return self._send(200, render_not_found_page(htno))
+
+        record = generate_student(htno)
+        html = render_result_page(record, missing_headers=scenario['missing_headers'],
+                                  numeric_labels=scenario['numeric_labels'])
+        self._send(200, html)
+
+    def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic JNTUH result pages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Base response delay")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Extra random delay up to this value")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests answered with 503")
+    parser.add_argument("--quiet", action="store_true", help="Disable per-request logging")
+    args = parser.parse_args()
+
+    StandinHandler.latency_ms = args.latency_ms
+    StandinHandler.jitter_ms = args.jitter_ms
+    StandinHandler.error_rate = args.error_rate
+    StandinHandler.quiet = args.quiet
+
+    server = ThreadingHTTPServer((args.host, args.port), StandinHandler)
+    print(f"Stand-in results site on http://{args.host}:{args.port}/academicresult/result?htno=<HTNO>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,8 @@ export default defineConfig({
       '/analyze': 'http://localhost:8000',
       '/predict': 'http://localhost:8000',
       '/notes': 'http://localhost:8000',
+      '/results': 'http://localhost:8000',
+      '/export': 'http://localhost:8000',
     }
   }
 })